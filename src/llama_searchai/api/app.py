@@ -6,18 +6,22 @@ This module defines the main FastAPI application with all routes and middleware.
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Security, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.security.api_key import APIKeyHeader
 from llamasearchai.config import settings
 from llamasearchai.models.common import ErrorResponse, HealthResponse
+from llamasearchai.services.search import SearchService, create_http_client
+from llamasearchai.services.utils import HAS_ORJSON, create_redis_client
 from loguru import logger
 
 # Import all route modules
 from .routes import (
     backup,
+    batch,
     embed,
     monitor,
     notify,
+    personalization,
     personalize,
     recommend,
     scheduler,
@@ -70,6 +74,8 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         openapi_url="/openapi.json",
         debug=settings.DEBUG,
+        # Encode response bodies with orjson when it is installed
+        default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse,
     )
 
     # Add CORS middleware
@@ -94,6 +100,32 @@ def create_app() -> FastAPI:
             ).dict(),
         )
 
+    # One pooled HTTP client and one Redis client live for the lifetime of the
+    # app's event loop
+    @app.on_event("startup")
+    async def create_services():
+        """Create the shared HTTP and Redis clients and the services that use them."""
+        app.state.search_client = create_http_client()
+        app.state.redis_client = create_redis_client()
+        app.state.search_service = SearchService(
+            http_client=app.state.search_client,
+            redis_client=app.state.redis_client,
+        )
+        personalization.personalization_service.attach_redis(app.state.redis_client)
+        scheduler.scheduler_service.attach_redis(app.state.redis_client)
+
+    @app.on_event("shutdown")
+    async def close_services():
+        """Stop the background services and close the shared clients."""
+        await scheduler.scheduler_service.close()
+        await backup.backup_service.close()
+        client = getattr(app.state, "search_client", None)
+        if client is not None:
+            await client.aclose()
+        redis_client = getattr(app.state, "redis_client", None)
+        if redis_client is not None:
+            await redis_client.close()
+
     # Health check endpoint
     @app.get(
         "/health",
@@ -189,6 +221,10 @@ def create_app() -> FastAPI:
             tags=["Notifications"],
         )
 
+    if settings.FEATURES.get("batch", True):
+        # Batch gateway over the search, embedding and reranking endpoints
+        app.include_router(batch.router, tags=["Batch"])
+
     return app
 
 
@@ -2,6 +2,7 @@
 Routes module for LlamaSearch AI API.
 """
 
+from .batch import router as batch_router
 from .personalization import router as personalization_router
 from .search import router as search_router
 from .vector import router as vector_router
@@ -10,4 +11,5 @@ __all__ = [
     "search_router",
     "vector_router",
     "personalization_router",
+    "batch_router",
 ]
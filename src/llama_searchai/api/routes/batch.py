@@ -0,0 +1,93 @@
+"""
+Batch route handlers for LlamaSearch AI API.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import APIRouter, Request, Security, status
+from llamasearchai.api.app import get_api_key
+from llamasearchai.config.settings import settings
+from llamasearchai.models.batch import BatchRequest, BatchResponse, BatchResult
+from loguru import logger
+
+# Create router
+router = APIRouter(
+    prefix="/api/v1/batch",
+    tags=["batch"],
+    dependencies=[Security(get_api_key)],
+)
+
+# Endpoint each batch operation is sent to
+_OPERATION_PATHS = {
+    "search": "/api/v1/search/",
+    "embed": "/api/v1/vector/embed",
+    "rerank": "/api/v1/personalization/rerank",
+}
+
+
+async def _run(client: httpx.AsyncClient, path: str, body: str) -> BatchResult:
+    """
+    Send one sub-request to its endpoint and capture its response.
+
+    Args:
+        client: Client calling the app in-process.
+        path: Path of the endpoint.
+        body: JSON body of the sub-request.
+
+    Returns:
+        BatchResult: The status code and body of the sub-request.
+    """
+    try:
+        response = await client.post(path, content=body)
+        return BatchResult(status=response.status_code, body=response.json())
+    except Exception as e:
+        logger.error(f"Error running batch operation: {e}")
+        return BatchResult(
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            body={"detail": f"Error running batch operation: {str(e)}"},
+        )
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(request: BatchRequest, http_request: Request) -> BatchResponse:
+    """
+    Run several search, embedding and reranking requests in one call.
+
+    The sub-requests run concurrently, each sent in-process to its own endpoint
+    with the caller's API key, so they get the same dependencies, response
+    validation and feature flags; a disabled endpoint answers 404. A failing
+    sub-request does not fail the others.
+
+    Args:
+        request: The batch of sub-requests.
+        http_request: The incoming HTTP request.
+
+    Returns:
+        BatchResponse: The result of each sub-request, keyed by operation name.
+    """
+    operations = {
+        name: operation.json(exclude_unset=True)
+        for name, operation in request.requests
+        if operation is not None
+    }
+
+    logger.info(f"Batch request received: {', '.join(operations) or 'empty'}")
+
+    headers = {"content-type": "application/json"}
+    api_key = http_request.headers.get(settings.API_KEY_HEADER)
+    if api_key is not None:
+        headers[settings.API_KEY_HEADER] = api_key
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=http_request.app),
+        base_url="http://batch",
+        headers=headers,
+    ) as client:
+        results = await asyncio.gather(
+            *(
+                _run(client, _OPERATION_PATHS[name], body)
+                for name, body in operations.items()
+            )
+        )
+    return BatchResponse(responses=dict(zip(operations, results)))
@@ -4,7 +4,16 @@ Search route handlers for LlamaSearch AI API.
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, Security, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    Security,
+    status,
+)
 from llamasearchai.api.app import get_api_key
 from llamasearchai.config.settings import settings
 from llamasearchai.models.search import Query as SearchQuery
@@ -12,7 +21,7 @@ from llamasearchai.models.search import (
     SearchRequest,
     SearchResponse,
 )
-from llamasearchai.services.search import SearchService
+from llamasearchai.services.search import SearchService, create_http_client
 from loguru import logger
 
 # Create router
@@ -22,12 +31,37 @@ router = APIRouter(
     dependencies=[Security(get_api_key)],
 )
 
-# Create service instance
-search_service = SearchService()
+
+def get_search_service(request: Request) -> SearchService:
+    """
+    Get the search service bound to the app's shared HTTP client.
+
+    The service is created at application startup; if the app was run without
+    its startup events, it is created on first use within the running loop,
+    without a results cache.
+
+    Args:
+        request: The incoming request.
+
+    Returns:
+        SearchService: The shared search service.
+    """
+    state = request.app.state
+    if getattr(state, "search_service", None) is None:
+        if getattr(state, "search_client", None) is None:
+            state.search_client = create_http_client()
+        state.search_service = SearchService(
+            http_client=state.search_client,
+            redis_client=getattr(state, "redis_client", None),
+        )
+    return state.search_service
 
 
 @router.post("/", response_model=SearchResponse)
-async def search(request: SearchRequest) -> SearchResponse:
+async def search(
+    request: SearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+) -> SearchResponse:
     """
     Perform a metasearch query across configured search engines.
 
@@ -59,11 +93,16 @@ async def search(request: SearchRequest) -> SearchResponse:
 
 @router.get("/analyze", response_model=SearchQuery)
 async def analyze_query(
+    response: Response,
     query: str = Query(..., description="The search query to analyze"),
+    search_service: SearchService = Depends(get_search_service),
 ) -> SearchQuery:
     """
     Analyze a search query to determine intent, locality, and other characteristics.
 
+    The X-Cache response header is HIT when the analysis of an identical query
+    was reused, and MISS otherwise.
+
     Args:
         query: The search query text to analyze.
 
@@ -73,7 +112,9 @@ async def analyze_query(
     logger.info(f"Query analysis request received: {query}")
 
     try:
-        return await search_service.analyze_query(query)
+        analyzed, cached = await search_service.analyze_query_cached(query)
+        response.headers["X-Cache"] = "HIT" if cached else "MISS"
+        return analyzed
     except Exception as e:
         logger.error(f"Error analyzing query: {e}")
         raise HTTPException(
@@ -88,6 +129,7 @@ async def get_search_trends(
     limit: int = Query(
         10, ge=1, le=50, description="Number of trending items to return"
     ),
+    search_service: SearchService = Depends(get_search_service),
 ) -> Dict[str, List[str]]:
     """
     Get current trending search queries.
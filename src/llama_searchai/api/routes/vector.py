@@ -73,6 +73,8 @@ async def vector_search(request: VectorSearchRequest) -> VectorSearchResponse:
 
     try:
         return await vector_service.vector_search(request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error performing vector search: {e}")
         raise HTTPException(
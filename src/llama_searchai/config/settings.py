@@ -46,21 +46,33 @@ class LlamaSearchSettings(BaseSettings):
     # AI/ML
     OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
     DEFAULT_MODEL: str = Field(default="gpt-3.5-turbo", env="LLAMASEARCH_DEFAULT_MODEL")
+    EMBEDDING_CACHE_SIZE: int = Field(
+        default=1024, env="LLAMASEARCH_EMBEDDING_CACHE_SIZE"
+    )
 
     # Metasearch
     GOOGLE_API_KEY: Optional[str] = Field(default=None, env="GOOGLE_API_KEY")
     GOOGLE_CX: Optional[str] = Field(default=None, env="GOOGLE_CX")
     BING_API_KEY: Optional[str] = Field(default=None, env="BING_API_KEY")
+    # Near-duplicate detection for combined results: "simhash", or "minhash",
+    # which needs the datasketch package and otherwise falls back to SimHash
+    SEARCH_DEDUP_METHOD: str = Field(
+        default="simhash", env="LLAMASEARCH_SEARCH_DEDUP_METHOD"
+    )
 
     # Vector DB
     VECTOR_DB_URL: Optional[str] = Field(default=None, env="LLAMASEARCH_VECTOR_DB_URL")
     VECTOR_DB_TYPE: str = Field(default="qdrant", env="LLAMASEARCH_VECTOR_DB_TYPE")
+    VECTOR_QUANTIZE_INT8: bool = Field(
+        default=False, env="LLAMASEARCH_VECTOR_QUANTIZE_INT8"
+    )
 
     # Personalization
     PERSONALIZATION_ENABLED: bool = Field(
         default=True, env="LLAMASEARCH_PERSONALIZATION_ENABLED"
     )
     PRIVACY_LEVEL: str = Field(default="high", env="LLAMASEARCH_PRIVACY_LEVEL")
+    PROFILE_CACHE_TTL: int = Field(default=3600, env="LLAMASEARCH_PROFILE_CACHE_TTL")
 
     # MLX Support
     USE_MLX: bool = Field(default=False, env="LLAMASEARCH_USE_MLX")
@@ -70,6 +82,14 @@ class LlamaSearchSettings(BaseSettings):
         default=str(BASE_DIR / "storage"), env="LLAMASEARCH_STORAGE_DIR"
     )
 
+    # Backup
+    MAX_CONCURRENT_BACKUPS: int = Field(
+        default=2, env="LLAMASEARCH_MAX_CONCURRENT_BACKUPS"
+    )
+
+    # Scheduler
+    SCHEDULER_WORKERS: int = Field(default=4, env="LLAMASEARCH_SCHEDULER_WORKERS")
+
     # Dashboard
     DASHBOARD_HOST: str = Field(default="0.0.0.0", env="LLAMASEARCH_DASHBOARD_HOST")
     DASHBOARD_PORT: int = Field(default=8050, env="LLAMASEARCH_DASHBOARD_PORT")
@@ -87,6 +107,7 @@ class LlamaSearchSettings(BaseSettings):
             "notifications": True,
             "backup": True,
             "simulator": False,
+            "batch": True,
         },
         env="LLAMASEARCH_FEATURES",
     )
@@ -0,0 +1,76 @@
+"""
+Batch request models for the LlamaSearch AI API.
+"""
+
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from .personalization import PersonalizationRequest
+from .search import SearchRequest
+from .vector import EmbedRequest
+
+
+class BatchOperations(BaseModel):
+    """
+    Sub-requests of a batch, at most one per operation.
+
+    Attributes:
+        search: Metasearch request, as sent to /api/v1/search/.
+        embed: Embedding request, as sent to /api/v1/vector/embed.
+        rerank: Personalization request, as sent to /api/v1/personalization/rerank.
+    """
+
+    search: Optional[SearchRequest] = None
+    embed: Optional[EmbedRequest] = None
+    rerank: Optional[PersonalizationRequest] = None
+
+
+class BatchRequest(BaseModel):
+    """
+    Batch request model.
+
+    Attributes:
+        requests: The sub-requests to run.
+    """
+
+    requests: BatchOperations
+
+
+class BatchResult(BaseModel):
+    """
+    Result of one sub-request of a batch.
+
+    Attributes:
+        status: HTTP status code returned by the sub-request's endpoint.
+        body: Response body, or an error detail if the sub-request failed.
+    """
+
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """
+    Batch response model.
+
+    Attributes:
+        responses: Result of each sub-request, keyed by operation name.
+    """
+
+    responses: Dict[str, BatchResult] = Field(default_factory=dict)
+
+    class Config:
+        """Pydantic model config."""
+
+        schema_extra = {
+            "example": {
+                "responses": {
+                    "embed": {"status": 200, "body": {"embeddings": []}},
+                    "rerank": {
+                        "status": 503,
+                        "body": {"detail": "Personalization is not enabled."},
+                    },
+                }
+            }
+        }
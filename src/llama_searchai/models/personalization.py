@@ -2,11 +2,12 @@
 Personalization-related models for LlamaSearch AI.
 """
 
+import hashlib
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 from .common import Metadata
 
@@ -61,11 +62,47 @@ class UserProfile(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    _lower_topics: Optional[Tuple[str, ...]] = PrivateAttr(default=None)
+    _lower_history_queries: Optional[Tuple[str, ...]] = PrivateAttr(default=None)
+    _content_digest: Optional[str] = PrivateAttr(default=None)
+
     @validator("updated_at", pre=True, always=True)
     def set_updated_at(cls, v):
         """Always set updated_at to current time on updates."""
         return datetime.utcnow()
 
+    @property
+    def lower_topics(self) -> Tuple[str, ...]:
+        """Lowercased topics of interest, computed once per profile instance."""
+        if self._lower_topics is None:
+            self._lower_topics = tuple(t.lower() for t in self.topics_of_interest)
+        return self._lower_topics
+
+    @property
+    def lower_history_queries(self) -> Tuple[str, ...]:
+        """Lowercased non-empty search history queries, computed once per instance."""
+        if self._lower_history_queries is None:
+            self._lower_history_queries = tuple(
+                h["query"].lower() for h in self.search_history if h.get("query")
+            )
+        return self._lower_history_queries
+
+    @property
+    def content_digest(self) -> str:
+        """Digest of every field but updated_at, computed once per instance."""
+        if self._content_digest is None:
+            self._content_digest = hashlib.blake2b(
+                self.json(exclude={"updated_at"}, sort_keys=True).encode(),
+                digest_size=16,
+            ).hexdigest()
+        return self._content_digest
+
+    def clear_cached_terms(self):
+        """Drop the lowercased term caches and digest after the profile changes."""
+        self._lower_topics = None
+        self._lower_history_queries = None
+        self._content_digest = None
+
     class Config:
         """Pydantic model config."""
 
@@ -122,12 +159,14 @@ class PersonalizationRequest(BaseModel):
         content: The content to personalize (search results, recommendations, etc).
         context: Optional context information.
         parameters: Additional personalization parameters.
+        top_k: Optional number of top-scoring items to return in the content.
     """
 
     user_id: str
     content: List[Dict[str, Any]]
     context: Optional[Dict[str, Any]] = None
     parameters: Dict[str, Any] = Field(default_factory=dict)
+    top_k: Optional[int] = Field(None, ge=1)
 
     class Config:
         """Pydantic model config."""
@@ -163,14 +202,15 @@ class PersonalizationResult(BaseModel):
         id: Identifier for the content item.
         original_score: The original score before personalization.
         personalized_score: The score after personalization.
-        explanation: Optional explanation of personalization factors.
+        explanation: Optional explanation of personalization factors: the boost
+            from each factor, and the topics of interest that matched.
     """
 
     id: str
     original_score: float
     personalized_score: float
     rank_change: int = 0
-    explanation: Optional[Dict[str, float]] = None
+    explanation: Optional[Dict[str, Any]] = None
 
 
 class PersonalizationMetadata(Metadata):
@@ -2,6 +2,7 @@
 Vector-related models for LlamaSearch AI.
 """
 
+import enum
 from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, validator
@@ -9,6 +10,14 @@ from pydantic import BaseModel, Field, validator
 from .common import Metadata
 
 
+class VectorPrecision(str, enum.Enum):
+    """Encoding of embedding vectors in responses."""
+
+    FP32 = "fp32"  # List of floats
+    FP16 = "fp16"  # Base64 of little-endian float16 values
+    INT8 = "int8"  # Base64 of int8 values, multiplied by the embedding's scale
+
+
 class EmbedRequest(BaseModel):
     """
     Embedding request model.
@@ -17,12 +26,14 @@ class EmbedRequest(BaseModel):
         text: Text or list of texts to embed.
         model: Optional embedding model to use.
         normalize: Whether to normalize the embeddings.
+        precision: Encoding of the returned vectors.
         parameters: Additional embedding parameters.
     """
 
     text: Union[str, List[str]]
     model: Optional[str] = None
     normalize: bool = True
+    precision: VectorPrecision = VectorPrecision.FP32
     parameters: Dict[str, Any] = Field(default_factory=dict)
 
     class Config:
@@ -43,16 +54,20 @@ class Embedding(BaseModel):
     Embedding model.
 
     Attributes:
-        vector: The embedding vector.
+        vector: The embedding vector, base64-encoded unless precision is fp32.
         text: The text that was embedded.
         model: The model used to create the embedding.
         dimensions: Number of dimensions in the embedding.
+        precision: Encoding of the vector.
+        scale: Factor to multiply int8 values by to recover the vector.
     """
 
-    vector: List[float]
+    vector: Union[List[float], str]
     text: str
     model: str
     dimensions: int
+    precision: VectorPrecision = VectorPrecision.FP32
+    scale: Optional[float] = None
 
     @validator("dimensions", pre=True, always=True)
     def set_dimensions(cls, v, values):
@@ -9,7 +9,7 @@ import random
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Coroutine, Dict, List, Optional, Set, Union
 from uuid import uuid4
 
 from llamasearchai.config.settings import settings
@@ -22,6 +22,7 @@ from llamasearchai.models.backup import (
     RestoreJobCreate,
     RestoreJobStatus,
 )
+from llamasearchai.services.utils import paginate
 from loguru import logger
 
 
@@ -35,12 +36,22 @@ class BackupService:
     def __init__(self):
         """Initialize the backup service."""
         # Ensure the base backup directory exists
-        self._backup_dir = Path(settings.STORAGE_DIR) / "backups"
+        self._storage_root: Path = Path(settings.STORAGE_DIR)
+        self._backup_dir = self._storage_root / "backups"
         self._backup_dir.mkdir(parents=True, exist_ok=True)
 
         self._backup_jobs: Dict[str, BackupJob] = {}
+        # Absolute backup file paths keyed by job ID, resolved once on completion
+        self._backup_paths: Dict[str, Path] = {}
         self._restore_jobs: Dict[str, RestoreJob] = {}
-        logger.info(f"BackupService initialized. Backup directory: {self._backup_dir}")
+        self._rng = random.Random()
+
+        # Background job tasks are tracked so they are not garbage collected
+        # mid-run, and a semaphore caps how many run concurrently; it is created
+        # on first use so that it belongs to the running event loop
+        self._bg_tasks: Set[asyncio.Task] = set()
+        self._bg_sem: Optional[asyncio.Semaphore] = None
+        logger.info("BackupService initialized. Backup directory: {}", self._backup_dir)
 
     async def create_backup(self, backup_create: BackupJobCreate) -> BackupJob:
         """
@@ -77,18 +88,62 @@ class BackupService:
 
         self._backup_jobs[job_id] = job
         logger.info(
-            f"Backup job {job_id} created for type: {backup_create.backup_type}"
+            "Backup job {} created for type: {}", job_id, backup_create.backup_type
         )
 
         # Start the backup process in the background (mock implementation)
-        asyncio.create_task(self._run_backup_job(job_id, backup_path))
+        self._spawn(
+            self._run_backup_job(job_id, backup_path), job, BackupJobStatus.FAILED
+        )
 
         # Update metadata processing time after initiating task
         job.metadata.processing_time = time.time() - start_time
-        self._backup_jobs[job_id] = job  # Update with processing time
 
         return job
 
+    def _spawn(
+        self,
+        coro: Coroutine,
+        job: Union[BackupJob, RestoreJob],
+        failed_status: Union[BackupJobStatus, RestoreJobStatus],
+    ) -> asyncio.Task:
+        """
+        Schedule a background job coroutine behind the concurrency limit.
+
+        Args:
+            coro: The coroutine running the job.
+            job: The job, marked as failed if it is cancelled before it starts.
+            failed_status: The failed status of the job's type.
+
+        Returns:
+            asyncio.Task: The task running the job.
+        """
+        if self._bg_sem is None:
+            self._bg_sem = asyncio.Semaphore(settings.MAX_CONCURRENT_BACKUPS)
+        sem = self._bg_sem
+        started = False
+
+        async def _guarded():
+            nonlocal started
+            async with sem:
+                started = True
+                await coro
+
+        def _done(task: asyncio.Task):
+            self._bg_tasks.discard(task)
+            if not started:
+                # Cancelled while waiting for a slot; the job never ran
+                coro.close()
+                logger.warning("Job {} cancelled before it started.", job.id)
+                job.status = failed_status
+                job.error_message = "Cancelled before it started"
+                job.updated_at = datetime.utcnow()
+
+        task = asyncio.create_task(_guarded())
+        self._bg_tasks.add(task)
+        task.add_done_callback(_done)
+        return task
+
     async def _run_backup_job(self, job_id: str, backup_path: Path):
         """Simulate running a backup job."""
         job = self._backup_jobs.get(job_id)
@@ -98,13 +153,12 @@ class BackupService:
         job.status = BackupJobStatus.RUNNING
         job.updated_at = datetime.utcnow()
         job.started_at = datetime.utcnow()
-        self._backup_jobs[job_id] = job
-        logger.info(f"Backup job {job_id} started.")
+        logger.info("Backup job {} started.", job_id)
 
         try:
             # TODO: Implement actual backup logic
             # e.g., dump database, archive files, upload to cloud storage
-            await asyncio.sleep(random.uniform(5.0, 15.0))  # Simulate work
+            await asyncio.sleep(self._rng.uniform(5.0, 15.0))  # Simulate work
 
             # Create a dummy backup file for demonstration
             backup_path.touch()
@@ -114,19 +168,25 @@ class BackupService:
                 )
 
             # Simulate file size
-            file_size_bytes = random.randint(
+            file_size_bytes = self._rng.randint(
                 10 * 1024 * 1024, 500 * 1024 * 1024
             )  # 10MB - 500MB
 
             job.status = BackupJobStatus.COMPLETED
-            job.file_path = str(backup_path.relative_to(settings.STORAGE_DIR))
+            job.file_path = str(backup_path.relative_to(self._storage_root))
+            self._backup_paths[job_id] = backup_path
             job.file_size_bytes = file_size_bytes
             logger.info(
-                f"Backup job {job_id} completed successfully. Path: {job.file_path}"
+                "Backup job {} completed successfully. Path: {}", job_id, job.file_path
             )
 
+        except asyncio.CancelledError:
+            logger.warning("Backup job {} cancelled.", job_id)
+            job.status = BackupJobStatus.FAILED
+            job.error_message = "Cancelled"
+            raise
         except Exception as e:
-            logger.error(f"Backup job {job_id} failed: {e}")
+            logger.error("Backup job {} failed: {}", job_id, e)
             job.status = BackupJobStatus.FAILED
             job.error_message = str(e)
         finally:
@@ -136,7 +196,6 @@ class BackupService:
                 job.duration_seconds = (
                     job.completed_at - job.started_at
                 ).total_seconds()
-            self._backup_jobs[job_id] = job
 
     async def list_backups(
         self,
@@ -155,17 +214,14 @@ class BackupService:
         Returns:
             List[BackupJob]: A list of backup jobs.
         """
-        all_jobs = list(self._backup_jobs.values())
-
-        if status:
-            filtered_jobs = [job for job in all_jobs if job.status == status]
-        else:
-            filtered_jobs = all_jobs
-
         # Sort by creation time (most recent first)
-        filtered_jobs.sort(key=lambda j: j.created_at, reverse=True)
-
-        return filtered_jobs[offset : offset + limit]
+        return paginate(
+            self._backup_jobs.values(),
+            key=lambda j: j.created_at,
+            offset=offset,
+            limit=limit,
+            predicate=(lambda j: j.status == status) if status else None,
+        )
 
     async def get_backup(self, job_id: str) -> Optional[BackupJob]:
         """
@@ -196,21 +252,25 @@ class BackupService:
         # Attempt to delete the backup file if it exists
         if job.file_path:
             try:
-                full_path = Path(settings.STORAGE_DIR) / job.file_path
+                full_path = self._resolve_backup_path(job)
                 if full_path.exists():
                     full_path.unlink()
-                    logger.info(f"Deleted backup file: {full_path}")
+                    logger.info("Deleted backup file: {}", full_path)
                 else:
-                    logger.warning(f"Backup file not found for deletion: {full_path}")
+                    logger.warning("Backup file not found for deletion: {}", full_path)
             except Exception as e:
                 logger.error(
-                    f"Error deleting backup file {job.file_path} for job {job_id}: {e}"
+                    "Error deleting backup file {} for job {}: {}",
+                    job.file_path,
+                    job_id,
+                    e,
                 )
                 # Proceed to delete the job record anyway?
 
         # Delete the job record
         del self._backup_jobs[job_id]
-        logger.info(f"Deleted backup job record {job_id}")
+        self._backup_paths.pop(job_id, None)
+        logger.info("Deleted backup job record {}", job_id)
         return True
 
     async def restore_from_backup(self, restore_create: RestoreJobCreate) -> RestoreJob:
@@ -260,19 +320,33 @@ class BackupService:
 
         self._restore_jobs[job_id] = job
         logger.info(
-            f"Restore job {job_id} created from backup {restore_create.source_backup_id}"
+            "Restore job {} created from backup {}",
+            job_id,
+            restore_create.source_backup_id,
         )
 
         # Start the restore process in the background
-        backup_file_path = Path(settings.STORAGE_DIR) / source_backup.file_path
-        asyncio.create_task(self._run_restore_job(job_id, backup_file_path))
+        backup_file_path = self._resolve_backup_path(source_backup)
+        self._spawn(
+            self._run_restore_job(job_id, backup_file_path),
+            job,
+            RestoreJobStatus.FAILED,
+        )
 
         # Update metadata processing time
         job.metadata.processing_time = time.time() - start_time
-        self._restore_jobs[job_id] = job
 
         return job
 
+    def _resolve_backup_path(self, job: BackupJob) -> Path:
+        """Return the absolute path of a backup file, reusing the cached path if known."""
+        cached = self._backup_paths.get(job.id)
+        if cached is not None:
+            return cached
+        full_path = self._storage_root / job.file_path
+        self._backup_paths[job.id] = full_path
+        return full_path
+
     async def _run_restore_job(self, job_id: str, backup_file_path: Path):
         """Simulate running a restore job."""
         job = self._restore_jobs.get(job_id)
@@ -282,8 +356,7 @@ class BackupService:
         job.status = RestoreJobStatus.RUNNING
         job.updated_at = datetime.utcnow()
         job.started_at = datetime.utcnow()
-        self._restore_jobs[job_id] = job
-        logger.info(f"Restore job {job_id} started from {backup_file_path}.")
+        logger.info("Restore job {} started from {}.", job_id, backup_file_path)
 
         try:
             # TODO: Implement actual restore logic
@@ -291,14 +364,19 @@ class BackupService:
             if not backup_file_path.exists():
                 raise FileNotFoundError(f"Backup file {backup_file_path} not found.")
 
-            await asyncio.sleep(random.uniform(10.0, 30.0))  # Simulate work
+            await asyncio.sleep(self._rng.uniform(10.0, 30.0))  # Simulate work
 
             # Simulate successful restore
             job.status = RestoreJobStatus.COMPLETED
-            logger.info(f"Restore job {job_id} completed successfully.")
+            logger.info("Restore job {} completed successfully.", job_id)
 
+        except asyncio.CancelledError:
+            logger.warning("Restore job {} cancelled.", job_id)
+            job.status = RestoreJobStatus.FAILED
+            job.error_message = "Cancelled"
+            raise
         except Exception as e:
-            logger.error(f"Restore job {job_id} failed: {e}")
+            logger.error("Restore job {} failed: {}", job_id, e)
             job.status = RestoreJobStatus.FAILED
             job.error_message = str(e)
         finally:
@@ -308,7 +386,6 @@ class BackupService:
                 job.duration_seconds = (
                     job.completed_at - job.started_at
                 ).total_seconds()
-            self._restore_jobs[job_id] = job
 
     async def get_restore_job(self, job_id: str) -> Optional[RestoreJob]:
         """
@@ -339,14 +416,18 @@ class BackupService:
         Returns:
             List[RestoreJob]: A list of restore jobs.
         """
-        all_jobs = list(self._restore_jobs.values())
-
-        if status:
-            filtered_jobs = [job for job in all_jobs if job.status == status]
-        else:
-            filtered_jobs = all_jobs
-
         # Sort by creation time (most recent first)
-        filtered_jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return paginate(
+            self._restore_jobs.values(),
+            key=lambda j: j.created_at,
+            offset=offset,
+            limit=limit,
+            predicate=(lambda j: j.status == status) if status else None,
+        )
 
-        return filtered_jobs[offset : offset + limit]
+    async def close(self):
+        """Cancel any backup or restore jobs still running in the background."""
+        for task in list(self._bg_tasks):
+            task.cancel()
+        await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+        self._bg_sem = None
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from uuid import uuid4
 
+import numpy as np
 from llamasearchai.config.settings import settings
 from llamasearchai.models.monitoring import (
     LogEntry,
@@ -21,6 +22,22 @@ from llamasearchai.models.monitoring import (
 )
 from loguru import logger
 
+# Mock metric names and their (low, high) ranges, drawn in a single batch
+_MOCK_METRIC_NAMES = (
+    "cpu_usage_percent",
+    "memory_usage_percent",
+    "disk_usage_percent",
+    "network_io_recv_mbps",
+    "network_io_sent_mbps",
+    "requests_per_second",
+    "error_rate_percent",
+    "avg_latency_ms",
+)
+_MOCK_METRIC_BOUNDS = (
+    np.array([5.0, 20.0, 10.0, 1.0, 0.5, 50.0, 0.0, 10.0]),
+    np.array([50.0, 80.0, 90.0, 100.0, 50.0, 1000.0, 2.0, 200.0]),
+)
+
 
 class MonitoringService:
     """
@@ -35,6 +52,8 @@ class MonitoringService:
         # or log aggregation tools (e.g., Elasticsearch, Loki)
         logger.info("MonitoringService initialized.")
         self._start_time = time.time()
+        self._rng = random.Random()
+        self._np_rng = np.random.default_rng()
 
     async def get_system_metrics(self) -> SystemMetrics:
         """
@@ -48,17 +67,10 @@ class MonitoringService:
 
         # TODO: Implement actual metric retrieval (e.g., using psutil or monitoring agent)
         # For now, generate mock metrics
-        metrics = {
-            "cpu_usage_percent": round(random.uniform(5.0, 50.0), 2),
-            "memory_usage_percent": round(random.uniform(20.0, 80.0), 2),
-            "disk_usage_percent": round(random.uniform(10.0, 90.0), 2),
-            "network_io_recv_mbps": round(random.uniform(1.0, 100.0), 2),
-            "network_io_sent_mbps": round(random.uniform(0.5, 50.0), 2),
-            "active_connections": random.randint(10, 500),
-            "requests_per_second": round(random.uniform(50.0, 1000.0), 2),
-            "error_rate_percent": round(random.uniform(0.0, 2.0), 2),
-            "avg_latency_ms": round(random.uniform(10.0, 200.0), 2),
-        }
+        low, high = _MOCK_METRIC_BOUNDS
+        values = np.round(self._np_rng.uniform(low, high), 2).tolist()
+        metrics = dict(zip(_MOCK_METRIC_NAMES, values))
+        metrics["active_connections"] = self._rng.randint(10, 500)
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -159,45 +171,45 @@ class MonitoringService:
         # TODO: Implement actual log retrieval (e.g., from a file or log aggregator)
         # For now, generate mock logs
 
-        logs = []
-        levels = ["INFO", "WARNING", "ERROR", "DEBUG"]
-        services = ["api", "search", "vector", "personalization", "monitoring"]
+        levels = np.array(["INFO", "WARNING", "ERROR", "DEBUG"])
+        services = np.array(
+            ["api", "search", "vector", "personalization", "monitoring"]
+        )
 
         start_time = query.start_time or (datetime.utcnow() - timedelta(hours=1))
         end_time = query.end_time or datetime.utcnow()
-
-        for i in range(query.limit):
-            log_time = start_time + timedelta(
-                seconds=random.randint(0, int((end_time - start_time).total_seconds()))
-            )
-            level = query.level or random.choice(levels)
-            service = query.service or random.choice(services)
-            message = f"This is a mock log entry {i+1} for service {service} with level {level}. Keyword: {query.keyword or 'none'}"
-
-            # Basic filtering simulation
-            if query.level and level != query.level:
-                continue
-            if query.service and service != query.service:
-                continue
-            if query.keyword and query.keyword.lower() not in message.lower():
-                continue
-
-            entry = LogEntry(
-                timestamp=log_time,
-                level=level,
-                service=service,
-                message=message,
-                request_id=str(uuid4()),
-                metadata={
-                    "host": "mock-host",
-                    "process_id": random.randint(1000, 9999),
-                },
+        limit = query.limit
+
+        # Draw every random column in one batch instead of per log entry
+        rng = self._np_rng
+        delta_s = max(int((end_time - start_time).total_seconds()), 0)
+        offsets = rng.integers(0, delta_s, size=limit, endpoint=True)
+        levels_arr = None if query.level else rng.choice(levels, limit).tolist()
+        services_arr = None if query.service else rng.choice(services, limit).tolist()
+        pids = rng.integers(1000, 9999, size=limit, endpoint=True).tolist()
+
+        # Sort logs by timestamp (descending) on the offsets before building entries
+        order = np.argsort(-offsets, kind="stable").tolist()
+        offsets = offsets.tolist()
+
+        # Level and service are fixed at draw time when filtered on, and the
+        # keyword is embedded in every message, so every drawn row matches and
+        # entries can be built in a single pass without a post-filter
+        keyword = query.keyword or "none"
+        logs = []
+        for i in order:
+            level = query.level or levels_arr[i]
+            service = query.service or services_arr[i]
+            message = f"This is a mock log entry {i+1} for service {service} with level {level}. Keyword: {keyword}"
+            logs.append(
+                LogEntry.construct(
+                    timestamp=start_time + timedelta(seconds=offsets[i]),
+                    level=level,
+                    service=service,
+                    message=message,
+                    request_id=str(uuid4()),
+                    metadata={"host": "mock-host", "process_id": pids[i]},
+                )
             )
-            logs.append(entry)
-
-        # Sort logs by timestamp (descending)
-        logs.sort(key=lambda x: x.timestamp, reverse=True)
 
-        return logs[
-            : query.limit
-        ]  # Ensure limit is respected after potential filtering
+        return logs
@@ -18,6 +18,7 @@ from llamasearchai.models.notification import (
     NotificationResult,
     NotificationStatus,
 )
+from llamasearchai.services.utils import paginate
 from loguru import logger
 
 
@@ -54,7 +55,10 @@ class NotificationService:
         error_message = None
 
         logger.info(
-            f"Attempting to send notification {notification_id} via {notification.channel} to {notification.recipient}"
+            "Attempting to send notification {} via {} to {}",
+            notification_id,
+            notification.channel,
+            notification.recipient,
         )
 
         # Check if the specific channel is enabled in settings (example)
@@ -70,7 +74,9 @@ class NotificationService:
             if notification.channel == NotificationChannel.EMAIL:
                 # Simulate sending email
                 logger.debug(
-                    f"Simulating email send to {notification.recipient} with subject: {notification.subject}"
+                    "Simulating email send to {} with subject: {}",
+                    notification.recipient,
+                    notification.subject,
                 )
                 await asyncio.sleep(
                     random.uniform(0.1, 0.5)
@@ -79,18 +85,21 @@ class NotificationService:
                 if "@" in notification.recipient:
                     status = NotificationStatus.SENT
                     logger.info(
-                        f"Successfully simulated sending email notification {notification_id}"
+                        "Successfully simulated sending email notification {}",
+                        notification_id,
                     )
                 else:
                     status = NotificationStatus.FAILED
                     error_message = "Invalid recipient format for email."
                     logger.warning(
-                        f"Failed sending email notification {notification_id}: {error_message}"
+                        "Failed sending email notification {}: {}",
+                        notification_id,
+                        error_message,
                     )
 
             elif notification.channel == NotificationChannel.WEBHOOK:
                 # Simulate sending webhook
-                logger.debug(f"Simulating webhook POST to {notification.recipient}")
+                logger.debug("Simulating webhook POST to {}", notification.recipient)
                 await asyncio.sleep(
                     random.uniform(0.2, 0.8)
                 )  # Simulate network latency
@@ -100,7 +109,8 @@ class NotificationService:
                 ) or notification.recipient.startswith("https://"):
                     status = NotificationStatus.SENT
                     logger.info(
-                        f"Successfully simulated sending webhook notification {notification_id}"
+                        "Successfully simulated sending webhook notification {}",
+                        notification_id,
                     )
                 else:
                     status = NotificationStatus.FAILED
@@ -108,19 +118,22 @@ class NotificationService:
                         "Invalid recipient format for webhook (must be URL)."
                     )
                     logger.warning(
-                        f"Failed sending webhook notification {notification_id}: {error_message}"
+                        "Failed sending webhook notification {}: {}",
+                        notification_id,
+                        error_message,
                     )
 
             elif notification.channel == NotificationChannel.SLACK:
                 # Simulate sending to Slack
                 logger.debug(
-                    f"Simulating sending Slack message to {notification.recipient}"
+                    "Simulating sending Slack message to {}", notification.recipient
                 )
                 await asyncio.sleep(random.uniform(0.3, 1.0))
                 # Placeholder: Assume success for demo
                 status = NotificationStatus.SENT
                 logger.info(
-                    f"Successfully simulated sending Slack notification {notification_id}"
+                    "Successfully simulated sending Slack notification {}",
+                    notification_id,
                 )
 
             else:
@@ -132,7 +145,7 @@ class NotificationService:
 
         except Exception as e:
             logger.error(
-                f"Unexpected error sending notification {notification_id}: {e}"
+                "Unexpected error sending notification {}: {}", notification_id, e
             )
             status = NotificationStatus.FAILED
             error_message = f"Internal server error: {str(e)}"
@@ -175,7 +188,9 @@ class NotificationService:
             List[NotificationResult]: A list of notification results.
         """
         # Return notifications from our mock history, most recent first
-        sorted_notifications = sorted(
-            self._sent_notifications, key=lambda x: x.timestamp, reverse=True
+        return paginate(
+            self._sent_notifications,
+            key=lambda x: x.timestamp,
+            offset=offset,
+            limit=limit,
         )
-        return sorted_notifications[offset : offset + limit]
@@ -5,11 +5,18 @@ This module implements the business logic for personalization-related operations
 such as managing user profiles and personalizing content.
 """
 
+import functools
+import hashlib
+import heapq
+import json
+import re
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 
+import numpy as np
 from llamasearchai.config.settings import settings
 from llamasearchai.models.common import Metadata
 from llamasearchai.models.personalization import (
@@ -23,7 +30,211 @@ from llamasearchai.models.personalization import (
     UserPreference,
     UserProfile,
 )
+from llamasearchai.services.utils import dump_models, new_request_id
 from loguru import logger
+from pydantic import parse_raw_as
+
+try:
+    # Use Numba to compile the scoring kernel if available
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    # Use an Aho-Corasick automaton for multi-term title matching if available
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    # Redis is optional; without it profiles are only cached in-process
+    import redis.asyncio as aioredis
+
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+# Timestamps NumPy can parse as naive datetime64 values
+_NAIVE_ISO_RE = re.compile(
+    r"^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?$"
+)
+
+# Requests with fewer items than this are cheaper to score than a cache round-trip
+_MEMOIZE_MIN_ITEMS = 10
+# Seconds a memoized personalization response stays valid
+_PERSONALIZATION_CACHE_TTL = 60
+
+
+def _score_items(
+    original_scores: np.ndarray, raw_scores: np.ndarray, boosts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute personalized scores and rank changes for a batch of items.
+
+    Args:
+        original_scores: Score of each item before personalization.
+        raw_scores: Score each item carried in the request, used for the
+            comparison against the following item.
+        boosts: Total personalization boost for each item.
+
+    Returns:
+        Tuple of personalized scores clamped to [0, 1] and rank changes.
+    """
+    num_items = original_scores.shape[0]
+    personalized = np.empty(num_items)
+    rank_changes = np.zeros(num_items, dtype=np.int64)
+    for i in range(num_items):
+        score = min(1.0, max(0.0, original_scores[i] + boosts[i]))
+        personalized[i] = score
+
+        # Calculate rank change (this is simplified)
+        if i > 0 and score > personalized[i - 1]:
+            rank_changes[i] = -1
+        elif i < num_items - 1 and score < raw_scores[i + 1]:
+            rank_changes[i] = 1
+    return personalized, rank_changes
+
+
+if HAS_NUMBA:
+    _score_items = njit(cache=True)(_score_items)
+
+
+def _days_old(timestamps: List[Any]) -> np.ndarray:
+    """
+    Compute the age in whole days of each ISO timestamp.
+
+    Naive ISO-8601 strings are parsed in one NumPy batch; anything else is
+    parsed individually with datetime.fromisoformat.
+
+    Args:
+        timestamps: Timestamp values, which may be missing or invalid.
+
+    Returns:
+        Array of ages in days, with NaN where a timestamp is missing or invalid.
+    """
+    now = datetime.now()
+    days = np.full(len(timestamps), np.nan)
+    fast = [
+        i
+        for i, ts in enumerate(timestamps)
+        if isinstance(ts, str) and _NAIVE_ISO_RE.match(ts)
+    ]
+    try:
+        parsed = np.array([timestamps[i] for i in fast], dtype="datetime64[us]")
+        days[fast] = (np.datetime64(now, "us") - parsed) // np.timedelta64(1, "D")
+        slow = set(range(len(timestamps))).difference(fast)
+    except ValueError:
+        slow = range(len(timestamps))
+
+    for i in slow:
+        ts = timestamps[i]
+        if ts is None:
+            continue
+        try:
+            days[i] = (now - datetime.fromisoformat(ts)).days
+        except (ValueError, TypeError):
+            pass
+    return days
+
+
+class _TermMatcher:
+    """
+    Matches a user's topics of interest and past search queries against titles.
+
+    The matching strategy is chosen once per profile shape: profiles without
+    terms skip matching entirely, and with pyahocorasick installed all terms
+    are found in a single pass over each title; otherwise each term is checked
+    with a substring search.
+    """
+
+    def __init__(
+        self,
+        topics: Tuple[str, ...],
+        lower_topics: Tuple[str, ...],
+        history_queries: Tuple[str, ...],
+    ):
+        """
+        Initialize the matcher.
+
+        Args:
+            topics: Topics of interest, in profile order.
+            lower_topics: The same topics, lowercased.
+            history_queries: Lowercased, non-empty queries from the search history.
+        """
+        self._topics = topics
+        self._lower_topics = lower_topics
+        self._history_queries = history_queries
+        self._automaton = None
+
+        if not (topics or history_queries):
+            self._impl = self._match_nothing
+        elif HAS_AHOCORASICK:
+            automaton = ahocorasick.Automaton()
+            for term in set(self._lower_topics + self._history_queries):
+                if term:
+                    automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
+            self._impl = self._match_automaton
+        else:
+            self._impl = self._match_substrings
+
+    def match(self, title: str) -> Tuple[List[str], int]:
+        """
+        Find the topics and history queries contained in a title.
+
+        Delegates to the strategy chosen in __init__ for this matcher's terms.
+
+        Args:
+            title: The lowercased title to search.
+
+        Returns:
+            Tuple of matched topics (in profile order) and the number of
+            history queries found in the title.
+        """
+        return self._impl(title)
+
+    @staticmethod
+    def _match_nothing(title: str) -> Tuple[List[str], int]:
+        """Match a title against a profile with no topics or history."""
+        return [], 0
+
+    def _match_substrings(self, title: str) -> Tuple[List[str], int]:
+        """Match a title by checking each term with a substring search."""
+        matched_topics = [
+            topic
+            for topic, lower in zip(self._topics, self._lower_topics)
+            if lower in title
+        ]
+        history_hits = sum(1 for q in self._history_queries if q in title)
+        return matched_topics, history_hits
+
+    def _match_automaton(self, title: str) -> Tuple[List[str], int]:
+        """Match a title with a single pass of the Aho-Corasick automaton."""
+        # An empty topic is a substring of every title
+        found = {term for _, term in self._automaton.iter(title)}
+        found.add("")
+        matched_topics = [
+            topic
+            for topic, lower in zip(self._topics, self._lower_topics)
+            if lower in found
+        ]
+        history_hits = sum(1 for q in self._history_queries if q in found)
+        return matched_topics, history_hits
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_term_matcher(
+    topics: Tuple[str, ...],
+    lower_topics: Tuple[str, ...],
+    history_queries: Tuple[str, ...],
+) -> _TermMatcher:
+    """Return a cached matcher for a profile's topics and history queries."""
+    return _TermMatcher(topics, lower_topics, history_queries)
 
 
 class PersonalizationService:
@@ -38,20 +249,41 @@ class PersonalizationService:
         """Initialize the personalization service."""
         self._personalization_enabled = settings.PERSONALIZATION_ENABLED
         self._default_privacy_level = settings.PRIVACY_LEVEL
-        self._redis_url = settings.REDIS_URL
+        self._cache_ttl = settings.PROFILE_CACHE_TTL
+        # Shared Redis client, attached at application startup
+        self._redis: Optional["aioredis.Redis"] = None
 
-        # Mock storage for development
+        # Mock storage for development, also used as a fallback when Redis
+        # is not configured or unavailable
         self._user_profiles = {}
         self._user_preferences = {}
+        # Per-user index of the stored preferences by category
+        self._user_preferences_by_category: Dict[
+            str, Dict[str, List[UserPreference]]
+        ] = {}
         self._user_feedback = {}
 
         # In a full implementation, this would initialize a database connection
         # for storing user profiles and preferences
 
+        if HAS_NUMBA:
+            # Compile the scoring kernel up front rather than on the first request
+            _score_items(np.zeros(1), np.zeros(1), np.zeros(1))
+
         logger.info(
             f"PersonalizationService initialized with privacy level: {self._default_privacy_level}"
         )
 
+    def attach_redis(self, redis_client: Optional["aioredis.Redis"]):
+        """
+        Use a shared Redis client for the profile and ranking caches.
+
+        Args:
+            redis_client: The client, closed by its owner, or None to cache
+                only in-process.
+        """
+        self._redis = redis_client
+
     async def personalize_content(
         self, request: PersonalizationRequest
     ) -> PersonalizationResponse:
@@ -71,125 +303,135 @@ class PersonalizationService:
             raise ValueError("Personalization is not enabled")
 
         # Record start time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Get user profile
         user_id = request.user_id
         profile = await self.get_user_profile(user_id)
 
-        # Make a copy of the content to personalize
-        personalized_content = list(request.content)
-
-        # Personalization results
-        personalization_results = []
-
-        # Apply personalization to each item
-        for i, item in enumerate(personalized_content):
-            # Get original score or default to 0.5
-            original_score = item.get("score", 0.5)
-
-            # In a real implementation, this would apply sophisticated personalization
-            # algorithms based on the user profile and content
+        # Serve repeated large requests from the shared cache; the key includes
+        # the profile's digest, so any change to the profile misses
+        cache_key = None
+        if len(request.content) >= _MEMOIZE_MIN_ITEMS:
+            content_digest = hashlib.blake2b(
+                json.dumps(request.content, sort_keys=True, default=str).encode(),
+                digest_size=16,
+            ).hexdigest()
+            cache_key = (
+                f"pz:{user_id}:{profile.content_digest}:{request.top_k}:"
+                f"{content_digest}"
+            )
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                response = PersonalizationResponse.parse_raw(cached)
+                response.metadata.processing_time = (
+                    time.perf_counter_ns() - start_ns
+                ) / 1e9
+                response.metadata.request_id = new_request_id()
+                response.metadata.timestamp = datetime.utcnow().isoformat()
+                return response
+
+        # The request content is read but never modified; personalized scores
+        # are kept in a side array and merged into copies of the output items
+        content = request.content
+
+        # In a real implementation, this would apply sophisticated personalization
+        # algorithms based on the user profile and content. For development, apply
+        # a simple personalization based on interests, recency and search history.
+        # String matching happens here in Python; the numeric scoring is done by
+        # _score_items over the resulting arrays.
+        num_items = len(content)
+        topic_boosts = np.zeros(num_items)
+        history_boosts = np.zeros(num_items)
+
+        # Recency boosts for all items at once; NaN marks missing timestamps
+        days_old = _days_old([item.get("timestamp") for item in content])
+        recency_boosts = np.nan_to_num(np.maximum(0.0, 0.2 - days_old * 0.01))
+        explanations = []
+
+        # Topics and past queries are matched against each title in one pass
+        matcher = _get_term_matcher(
+            tuple(profile.topics_of_interest),
+            profile.lower_topics,
+            profile.lower_history_queries,
+        )
 
-            # For development, apply a simple personalization based on interests
-            personalized_score = original_score
+        for i, item in enumerate(content):
+            title = item.get("title", "").lower()
             explanation = {}
+            matched_topics, history_hits = matcher.match(title)
 
-            if "topics_of_interest" in profile:
-                # Check for topic matches in title or metadata
-                title = item.get("title", "").lower()
-                topic_score = 0.0
-                matched_topics = []
-
-                for topic in profile["topics_of_interest"]:
-                    if topic.lower() in title:
-                        topic_score += 0.1
-                        matched_topics.append(topic)
-
-                # Apply topic boost (max 0.3)
-                topic_boost = min(topic_score, 0.3)
-                personalized_score += topic_boost
-
-                if matched_topics:
-                    explanation["topic_relevance"] = topic_boost
-                    explanation["matched_topics"] = matched_topics
+            # Apply topic boost (max 0.3)
+            topic_boost = min(len(matched_topics) * 0.1, 0.3)
+            topic_boosts[i] = topic_boost
+            if matched_topics:
+                explanation["topic_relevance"] = topic_boost
+                explanation["matched_topics"] = matched_topics
 
             # Apply recency bias - prefer newer content
-            if "timestamp" in item:
-                try:
-                    item_date = datetime.fromisoformat(item["timestamp"])
-                    days_old = (datetime.now() - item_date).days
-                    recency_boost = max(0.0, 0.2 - (days_old * 0.01))
-                    personalized_score += recency_boost
-                    explanation["recency_boost"] = recency_boost
-                except (ValueError, TypeError):
-                    pass
-
-            # Check past history if available
-            if "search_history" in profile:
-                # Look for similar searches
-                history_match = 0.0
-                for history_item in profile["search_history"]:
-                    query = history_item.get("query", "").lower()
-                    if query and query in title:
-                        history_match += 0.05
-
-                personalized_score += min(history_match, 0.15)
-                if history_match > 0:
-                    explanation["history_match"] = min(history_match, 0.15)
-
-            # Ensure score is between 0 and 1
-            personalized_score = max(0.0, min(1.0, personalized_score))
-
-            # Calculate rank change (this is simplified)
-            rank_change = 0
-            if i > 0 and personalized_score > personalized_content[i - 1].get(
-                "score", 0
-            ):
-                rank_change = -1
-            elif i < len(
-                personalized_content
-            ) - 1 and personalized_score < personalized_content[i + 1].get("score", 0):
-                rank_change = 1
-
-            # Create result
-            result = PersonalizationResult(
+            if not np.isnan(days_old[i]):
+                explanation["recency_boost"] = float(recency_boosts[i])
+
+            # Check past history for similar searches
+            history_match = min(history_hits * 0.05, 0.15)
+            history_boosts[i] = history_match
+            if history_hits:
+                explanation["history_match"] = history_match
+
+            explanations.append(explanation)
+
+        # Original scores default to 0.5 for the item itself, while rank changes
+        # compare against the raw score of the next item (defaulting to 0)
+        original_scores = [item.get("score", 0.5) for item in content]
+        personalized_scores, rank_changes = _score_items(
+            np.array(original_scores, dtype=np.float64),
+            np.array(
+                [item.get("score", 0) for item in content],
+                dtype=np.float64,
+            ),
+            topic_boosts + recency_boosts + history_boosts,
+        )
+
+        # Personalization results
+        scores = personalized_scores.tolist()
+        personalization_results = [
+            PersonalizationResult(
                 id=item.get("id", f"item-{i}"),
-                original_score=original_score,
-                personalized_score=personalized_score,
-                rank_change=rank_change,
-                explanation=explanation,
+                original_score=original_scores[i],
+                personalized_score=scores[i],
+                rank_change=int(rank_changes[i]),
+                explanation=explanations[i],
             )
-            personalization_results.append(result)
-
-            # Update the score in the content
-            personalized_content[i]["score"] = personalized_score
+            for i, item in enumerate(content)
+        ]
 
-        # Sort content by personalized score
-        personalized_content.sort(key=lambda x: x.get("score", 0), reverse=True)
+        # Order item indices by personalized score, keeping only the top_k if the
+        # caller asked for them, and copy just those items with their new score
+        if request.top_k:
+            order = heapq.nlargest(
+                request.top_k, range(num_items), key=scores.__getitem__
+            )
+        else:
+            order = sorted(range(num_items), key=scores.__getitem__, reverse=True)
+        personalized_content = [{**content[i], "score": scores[i]} for i in order]
 
         # Calculate processing time
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
-        # Get profile age for metadata
-        profile_age_days = 0.0
-        if profile.get("created_at"):
-            try:
-                created_at = datetime.fromisoformat(profile["created_at"])
-                profile_age_days = (datetime.now() - created_at).days
-            except (ValueError, TypeError):
-                profile_age_days = 30.0  # Default
+        # Get profile age for metadata; created_at is naive UTC unless the
+        # profile was stored with an offset
+        created_at = profile.created_at
+        now = datetime.now(timezone.utc) if created_at.tzinfo else datetime.utcnow()
+        profile_age_days = float((now - created_at).days)
 
         # Calculate profile completeness
         profile_completeness = self._calculate_profile_completeness(profile)
 
         # Create metadata
-        privacy_level = PrivacyLevel(
-            profile.get("privacy_level", self._default_privacy_level)
-        )
+        privacy_level = PrivacyLevel(profile.privacy_level)
         metadata = PersonalizationMetadata(
             processing_time=processing_time,
-            request_id=str(uuid4()),
+            request_id=new_request_id(),
             timestamp=datetime.utcnow().isoformat(),
             version="0.1.0",
             source="llamasearch-api",
@@ -206,12 +448,18 @@ class PersonalizationService:
             privacy_level=privacy_level,
         )
 
-        # Return the response
-        return PersonalizationResponse(
+        response = PersonalizationResponse(
             results=personalization_results,
             content=personalized_content,
             metadata=metadata,
         )
+        if cache_key is not None:
+            await self._cache_set(
+                cache_key, dump_models(response), ttl=_PERSONALIZATION_CACHE_TTL
+            )
+
+        # Return the response
+        return response
 
     async def get_user_profile(self, user_id: str) -> UserProfile:
         """
@@ -226,9 +474,28 @@ class PersonalizationService:
         if not self._personalization_enabled:
             raise ValueError("Personalization is not enabled")
 
-        # Check if profile exists in mock storage
-        if user_id in self._user_profiles:
-            return self._user_profiles[user_id]
+        # Mock storage holds the profile instance, along with its cached terms,
+        # that every request reuses. With Redis shared between workers, Redis
+        # is the source of truth: the local instance is reused only while its
+        # digest matches the version last stored by any worker
+        profile = self._user_profiles.get(user_id)
+        cache_key = f"user:{user_id}:profile"
+        if self._redis is not None:
+            version = await self._cache_get(f"{cache_key}:version")
+            if isinstance(version, bytes):
+                version = version.decode()
+            if profile is not None and version == profile.content_digest:
+                return profile
+
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                profile = UserProfile.parse_raw(cached)
+                self._user_profiles[user_id] = profile
+                return profile
+
+        # Without Redis, or once its copy has expired, the local profile stands
+        if profile is not None:
+            return profile
 
         # In production, fetch from database
         # For development, create a mock profile
@@ -261,8 +528,8 @@ class PersonalizationService:
             updated_at=datetime.utcnow() - timedelta(days=1),
         )
 
-        # Store in mock storage
-        self._user_profiles[user_id] = profile
+        # Store in mock storage and the shared cache
+        await self._store_profile(profile)
 
         return profile
 
@@ -289,12 +556,13 @@ class PersonalizationService:
         if user_id != profile.user_id:
             raise ValueError("User ID in path does not match user ID in profile")
 
-        # Update the updated_at timestamp
+        # Update the updated_at timestamp and drop derived term caches
         profile.updated_at = datetime.utcnow()
+        profile.clear_cached_terms()
 
         # In production, save to database
-        # For development, save to mock storage
-        self._user_profiles[user_id] = profile
+        # For development, save to mock storage and the shared cache
+        await self._store_profile(profile)
 
         return profile
 
@@ -314,7 +582,7 @@ class PersonalizationService:
             raise ValueError("Personalization is not enabled")
 
         # Record start time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # In production, save to database
         # For development, save to mock storage
@@ -324,8 +592,9 @@ class PersonalizationService:
 
         # Add timestamp if not present
         feedback_data = request.dict()
+        now_iso = datetime.utcnow().isoformat()
         if "timestamp" not in feedback_data:
-            feedback_data["timestamp"] = datetime.utcnow().isoformat()
+            feedback_data["timestamp"] = now_iso
 
         # Generate a feedback ID
         feedback_id = str(uuid4())
@@ -335,13 +604,13 @@ class PersonalizationService:
         self._user_feedback[user_id].append(feedback_data)
 
         # Calculate processing time
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Create metadata
         metadata = Metadata(
             processing_time=processing_time,
-            request_id=str(uuid4()),
-            timestamp=datetime.utcnow().isoformat(),
+            request_id=new_request_id(),
+            timestamp=now_iso,
             version="0.1.0",
             source="llamasearch-api",
         )
@@ -370,10 +639,16 @@ class PersonalizationService:
         if not self._personalization_enabled:
             raise ValueError("Personalization is not enabled")
 
-        # Check if preferences exist in mock storage
-        if user_id in self._user_preferences:
-            preferences = self._user_preferences[user_id]
-        else:
+        # Check the shared cache first, then mock storage
+        cache_key = f"user:{user_id}:prefs"
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            preferences = parse_raw_as(List[UserPreference], cached)
+            if category:
+                return [p for p in preferences if p.category == category]
+            return preferences
+
+        if user_id not in self._user_preferences:
             # In production, fetch from database
             # For development, create mock preferences
             preferences = [
@@ -403,48 +678,105 @@ class PersonalizationService:
                 ),
             ]
 
-            # Store in mock storage
-            self._user_preferences[user_id] = preferences
+            # Store in mock storage and the shared cache
+            self._store_preferences(user_id, preferences)
+            await self._cache_set(cache_key, dump_models(preferences))
 
         # Filter by category if provided
         if category:
-            return [p for p in preferences if p.category == category]
+            by_category = self._user_preferences_by_category[user_id]
+            return list(by_category.get(category, ()))
 
-        return preferences
+        return self._user_preferences[user_id]
 
-    def _calculate_profile_completeness(self, profile: Dict[str, Any]) -> float:
+    def _store_preferences(self, user_id: str, preferences: List[UserPreference]):
         """
-        Calculate the completeness of a user profile.
+        Store a user's preferences and rebuild their category index.
 
         Args:
-            profile: The user profile.
+            user_id: The user ID the preferences belong to.
+            preferences: The user's preferences.
+        """
+        by_category = defaultdict(list)
+        for preference in preferences:
+            by_category[preference.category].append(preference)
+        self._user_preferences[user_id] = preferences
+        self._user_preferences_by_category[user_id] = dict(by_category)
 
-        Returns:
-            Completeness score between 0 and 1.
+    async def _store_profile(self, profile: UserProfile):
         """
-        # Define the fields that contribute to completeness
-        fields = [
-            "preferences",
-            "topics_of_interest",
-            "search_history",
-            "embedding",
-        ]
+        Store a profile in mock storage and the shared cache.
 
-        # Count how many fields are populated
-        populated = sum(1 for field in fields if field in profile and profile[field])
+        The profile is written before its version, so a worker that sees the
+        new version also reads the new profile.
 
-        # Calculate completeness
-        completeness = populated / len(fields)
+        Args:
+            profile: The profile to store.
+        """
+        cache_key = f"user:{profile.user_id}:profile"
+        self._user_profiles[profile.user_id] = profile
+        await self._cache_set(cache_key, dump_models(profile))
+        await self._cache_set(f"{cache_key}:version", profile.content_digest)
 
-        # Adjust based on the size/quality of each field
-        if "preferences" in profile and profile["preferences"]:
-            completeness += min(0.1, len(profile["preferences"]) * 0.02)
+    async def _cache_get(self, key: str) -> Optional[bytes]:
+        """
+        Read a value from the Redis cache.
 
-        if "topics_of_interest" in profile and profile["topics_of_interest"]:
-            completeness += min(0.1, len(profile["topics_of_interest"]) * 0.02)
+        Args:
+            key: The cache key.
 
-        if "search_history" in profile and profile["search_history"]:
-            completeness += min(0.1, len(profile["search_history"]) * 0.01)
+        Returns:
+            The cached value, or None on a miss or if Redis is unavailable.
+        """
+        if self._redis is None:
+            return None
+        try:
+            return await self._redis.get(key)
+        except Exception as e:
+            logger.warning("Redis cache read failed for {}: {}", key, e)
+            return None
+
+    async def _cache_set(
+        self, key: str, value: Union[str, bytes], ttl: Optional[int] = None
+    ) -> None:
+        """
+        Write a value to the Redis cache.
 
-        # Ensure completeness is between 0 and 1
-        return max(0.0, min(1.0, completeness))
+        Args:
+            key: The cache key.
+            value: The serialized value to store.
+            ttl: Expiry in seconds, defaulting to the configured profile TTL.
+        """
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, value, ex=ttl or self._cache_ttl)
+        except Exception as e:
+            logger.warning("Redis cache write failed for {}: {}", key, e)
+
+    def _calculate_profile_completeness(self, profile: UserProfile) -> float:
+        """
+        Calculate the completeness of a user profile.
+
+        Args:
+            profile: The user profile.
+
+        Returns:
+            Completeness score between 0 and 1.
+        """
+        preferences = profile.preferences or ()
+        topics = profile.topics_of_interest or ()
+        history = profile.search_history or ()
+        embedding = profile.embedding or ()
+
+        # Each populated field contributes a quarter, plus a bonus for its size.
+        # Empty fields have length 0, so no per-field checks are needed.
+        populated = (
+            bool(preferences) + bool(topics) + bool(history) + bool(embedding)
+        ) * 0.25
+        bonus = (
+            min(0.1, len(preferences) * 0.02)
+            + min(0.1, len(topics) * 0.02)
+            + min(0.1, len(history) * 0.01)
+        )
+        return min(1.0, populated + bonus)
@@ -5,11 +5,16 @@ This module implements the business logic for scheduling and managing background
 """
 
 import asyncio
+import functools
+import heapq
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+import numpy as np
+from llamasearchai.config.settings import settings
 from llamasearchai.models.scheduler import (
     Job,
     JobCreate,
@@ -18,8 +23,154 @@ from llamasearchai.models.scheduler import (
     Schedule,
     SchedulerMetadata,
 )
+from llamasearchai.services.utils import new_request_id
 from loguru import logger
 
+try:
+    # Redis is optional; without it job state is only kept in-process
+    import redis.asyncio as aioredis
+
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+try:
+    # Use croniter to compute cron schedules if available
+    from croniter import croniter
+
+    HAS_CRONITER = True
+except ImportError:
+    HAS_CRONITER = False
+
+# Compact integer codes for job statuses, used by the columnar job index
+_STATUS_CODES = {status: code for code, status in enumerate(JobStatus)}
+
+
+@functools.lru_cache(maxsize=4096)
+def _cron_iter(expression: str) -> "croniter":
+    """
+    Return a reusable croniter for a cron expression.
+
+    The expression is parsed once; callers move the iterator to the desired
+    start time with ``set_current`` before asking for the next run.
+
+    Args:
+        expression: The cron expression.
+
+    Returns:
+        croniter: The iterator for the expression.
+    """
+    return croniter(expression, datetime.utcnow())
+
+
+class _JobIndex:
+    """
+    Columnar index over the job fields the scheduler scans.
+
+    Keeps job IDs, status codes, next run and creation timestamps in parallel
+    NumPy arrays so that counts and listings are vectorized masks rather than
+    loops over Job models. Rows are removed by moving the last
+    row into the freed slot.
+    """
+
+    _GROW_BY = 1024
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._job_ids = np.empty(0, dtype=object)
+        self._status = np.empty(0, dtype=np.int8)
+        self._next_run_ts = np.empty(0, dtype=np.float64)
+        self._created_ts = np.empty(0, dtype=np.float64)
+
+    def _grow(self):
+        """Extend every column by another chunk of rows."""
+        capacity = len(self._job_ids) + self._GROW_BY
+        for name in ("_job_ids", "_status", "_next_run_ts", "_created_ts"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            setattr(self, name, grown)
+
+    def upsert(self, job: Job):
+        """
+        Add a job to the index or refresh its indexed fields.
+
+        Args:
+            job: The job to index.
+        """
+        row = self._rows.get(job.id)
+        if row is None:
+            if self._size == len(self._job_ids):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[job.id] = row
+            self._job_ids[row] = job.id
+        self._status[row] = _STATUS_CODES[job.status]
+        self._next_run_ts[row] = (
+            job.next_run_time.timestamp() if job.next_run_time else np.inf
+        )
+        self._created_ts[row] = job.created_at.timestamp()
+
+    def remove(self, job_id: str):
+        """
+        Remove a job from the index.
+
+        Args:
+            job_id: The ID of the job to remove.
+        """
+        row = self._rows.pop(job_id, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            for column in (
+                self._job_ids,
+                self._status,
+                self._next_run_ts,
+                self._created_ts,
+            ):
+                column[row] = column[last]
+            self._rows[self._job_ids[row]] = row
+        self._job_ids[last] = None
+        self._size = last
+
+    def count(self, status: JobStatus) -> int:
+        """
+        Count the jobs with a given status.
+
+        Args:
+            status: The job status to count.
+
+        Returns:
+            int: The number of jobs with that status.
+        """
+        return int(
+            np.count_nonzero(self._status[: self._size] == _STATUS_CODES[status])
+        )
+
+    def page(self, status: Optional[JobStatus], offset: int, limit: int) -> List[str]:
+        """
+        List job IDs newest first, optionally filtered by status.
+
+        Args:
+            status: Optional job status to filter by.
+            offset: Number of jobs to skip.
+            limit: Maximum number of jobs to return.
+
+        Returns:
+            List[str]: IDs of the jobs on the requested page.
+        """
+        n = self._size
+        if status:
+            rows = np.flatnonzero(self._status[:n] == _STATUS_CODES[status])
+        else:
+            rows = np.arange(n)
+        order = np.argsort(-self._created_ts[rows], kind="stable")
+        return self._job_ids[rows[order][offset : offset + limit]].tolist()
+
 
 class SchedulerService:
     """
@@ -28,16 +179,52 @@ class SchedulerService:
     Manages the creation, retrieval, update, and deletion of scheduled jobs.
     """
 
+    # Heap size below which stale due entries are left for pops to discard
+    _MIN_HEAP_COMPACT = 64
+
     def __init__(self):
         """Initialize the scheduler service."""
         # In a real implementation, this would likely use a library like APScheduler,
         # Celery Beat, or integrate with a dedicated task queue system.
         self._jobs: Dict[str, Job] = {}
+        self._job_index = _JobIndex()
+        # Min-heap of (next run timestamp, job ID); stale entries are skipped on pop
+        self._due_heap: List[Tuple[float, str]] = []
+        # Task functions by name, run on a bounded pool off the event loop
+        self._task_registry: Dict[str, Callable[..., Any]] = {}
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.SCHEDULER_WORKERS,
+            thread_name_prefix="llamasearch-scheduler",
+        )
+        # Limits the tasks handed to the pool to its size, created on first use
+        self._run_slots: Optional[asyncio.Semaphore] = None
+        # Job state is mirrored to Redis hashes once a client is attached
+        self._redis: Optional["aioredis.Redis"] = None
         self._scheduler_running = False
         logger.info("SchedulerService initialized.")
         # Optionally start a background task runner if needed
         # asyncio.create_task(self._run_scheduler())
 
+    def attach_redis(self, redis_client: Optional["aioredis.Redis"]):
+        """
+        Mirror job state to Redis using a shared client.
+
+        Args:
+            redis_client: The client, closed by its owner, or None to keep job
+                state only in-process.
+        """
+        self._redis = redis_client
+
+    def register_task(self, task_name: str, func: Callable[..., Any]):
+        """
+        Register the function that runs jobs with the given task name.
+
+        Args:
+            task_name: The task name jobs are scheduled under.
+            func: A blocking callable, invoked with the job's args and kwargs.
+        """
+        self._task_registry[task_name] = func
+
     async def schedule_job(self, job_create: JobCreate) -> Job:
         """
         Schedule a new background job.
@@ -49,7 +236,7 @@ class SchedulerService:
             Job: The newly created and scheduled job.
         """
         # Record start time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         job_id = str(uuid4())
         now = datetime.utcnow()
@@ -74,22 +261,23 @@ class SchedulerService:
 
         # TODO: Implement actual scheduling logic (e.g., add to APScheduler)
         self._jobs[job_id] = job
+        self._job_index.upsert(job)
+        self._push_due(job)
+        await self._store_job_states([job])
         logger.info(f"Scheduled new job {job_id}: {job.task_name}")
 
         # Calculate processing time
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Create metadata (example)
         metadata = SchedulerMetadata(
             processing_time=processing_time,
-            request_id=str(uuid4()),
-            timestamp=datetime.utcnow().isoformat(),
+            request_id=new_request_id(),
+            timestamp=now.isoformat(),
             version="0.1.0",
             source="llamasearch-scheduler-service",
             total_jobs=len(self._jobs),
-            pending_jobs=sum(
-                1 for j in self._jobs.values() if j.status == JobStatus.PENDING
-            ),
+            pending_jobs=self._job_index.count(JobStatus.PENDING),
         )
 
         # Add metadata to the job response (optional, depending on API design)
@@ -125,17 +313,8 @@ class SchedulerService:
             List[Job]: A list of scheduled jobs.
         """
         # TODO: Retrieve jobs from the actual scheduler store
-        all_jobs = list(self._jobs.values())
-
-        if status:
-            filtered_jobs = [job for job in all_jobs if job.status == status]
-        else:
-            filtered_jobs = all_jobs
-
-        # Sort by creation time (most recent first)
-        filtered_jobs.sort(key=lambda j: j.created_at, reverse=True)
-
-        return filtered_jobs[offset : offset + limit]
+        job_ids = self._job_index.page(status, offset, limit)
+        return [self._jobs[job_id] for job_id in job_ids]
 
     async def update_job(self, job_id: str, job_update: JobUpdate) -> Optional[Job]:
         """
@@ -153,7 +332,11 @@ class SchedulerService:
             return None
 
         # TODO: Implement actual job update logic in the scheduler
-        update_data = job_update.dict(exclude_unset=True)
+        # Read the set fields directly; exclude_unset would also convert any
+        # nested models to dicts before they are assigned back onto the job
+        update_data = {
+            key: getattr(job_update, key) for key in job_update.__fields_set__
+        }
 
         for key, value in update_data.items():
             setattr(job, key, value)
@@ -164,6 +347,9 @@ class SchedulerService:
 
         job.updated_at = datetime.utcnow()
         self._jobs[job_id] = job  # Update mock store
+        self._job_index.upsert(job)
+        self._push_due(job)
+        await self._store_job_states([job])
         logger.info(f"Updated job {job_id}")
 
         return job
@@ -181,6 +367,8 @@ class SchedulerService:
         # TODO: Implement actual job deletion logic in the scheduler
         if job_id in self._jobs:
             del self._jobs[job_id]
+            self._job_index.remove(job_id)
+            await self._delete_job_state(job_id)
             logger.info(f"Deleted job {job_id}")
             return True
         return False
@@ -199,22 +387,23 @@ class SchedulerService:
         if not job:
             return False
 
-        # TODO: Implement actual job triggering logic (e.g., run the task function)
         logger.info(f"Manually triggering job {job_id}: {job.task_name}")
-        # Simulate running the job
         job.status = JobStatus.RUNNING
         job.last_run_time = datetime.utcnow()
-        # Simulate completion after a short delay
-        await asyncio.sleep(random.uniform(0.5, 2.0))
-        job.status = JobStatus.COMPLETED
+        self._job_index.upsert(job)
+        await self._store_job_states([job])
+        succeeded = await self._execute_job(job)
+        job.status = JobStatus.COMPLETED if succeeded else JobStatus.FAILED
         job.updated_at = datetime.utcnow()
         self._jobs[job_id] = job  # Update mock store
+        self._job_index.upsert(job)
+        await self._store_job_states([job])
 
         return True
 
     def _calculate_next_run(self, schedule: Schedule) -> Optional[datetime]:
         """
-        Calculate the next run time based on the schedule. (Placeholder)
+        Calculate the next run time based on the schedule.
 
         Args:
             schedule: The schedule details.
@@ -233,9 +422,11 @@ class SchedulerService:
             return now + timedelta(seconds=schedule.interval_seconds)
 
         if schedule.cron_expression:
-            # TODO: Implement proper cron parsing and next run calculation
-            # Using a library like 'croniter' would be appropriate here.
-            # For now, just schedule it for 5 minutes from now as a placeholder.
+            if HAS_CRONITER:
+                cron = _cron_iter(schedule.cron_expression)
+                cron.set_current(now)
+                return cron.get_next(datetime)
+            # Without croniter, schedule it for 5 minutes from now as a placeholder
             return now + timedelta(minutes=5)
 
         return None  # Should not happen if schedule is valid
@@ -249,48 +440,218 @@ class SchedulerService:
         logger.info("Mock scheduler loop started.")
         while self._scheduler_running:
             now = datetime.utcnow()
-            for job_id, job in list(self._jobs.items()):
-                if (
-                    job.status == JobStatus.PENDING
-                    and job.next_run_time
-                    and job.next_run_time <= now
+            due_jobs = [self._jobs[job_id] for job_id in self._pop_due_jobs(now)]
+
+            # Claim every due job up front so the state writes share one round trip
+            for job in due_jobs:
+                job.status = JobStatus.RUNNING
+                job.last_run_time = now
+                self._job_index.upsert(job)
+            await self._store_job_states(due_jobs)
+
+            # Run the claimed jobs together, so a slow job does not hold up the
+            # others; _execute_job keeps at most one task per pool worker
+            for job in due_jobs:
+                logger.info(f"Running job {job.id}: {job.task_name}")
+            outcomes = await asyncio.gather(
+                *(self._execute_job(job) for job in due_jobs), return_exceptions=True
+            )
+
+            for job, outcome in zip(due_jobs, outcomes):
+                job_id = job.id
+                if job_id not in self._jobs:  # Deleted while it was running
+                    continue
+                if isinstance(outcome, BaseException):
+                    logger.error("Job {} failed: {}", job_id, outcome)
+                if outcome is True:
+                    job.status = JobStatus.COMPLETED
+                else:
+                    job.status = JobStatus.FAILED
+                    job.retries_left = (
+                        job.retries_left - 1 if job.retries_left > 0 else 0
+                    )
+                job.updated_at = datetime.utcnow()
+
+                # Reschedule if it's a recurring job
+                if job.status == JobStatus.COMPLETED and (
+                    job.schedule.interval_seconds or job.schedule.cron_expression
                 ):
-                    logger.info(f"Running job {job_id}: {job.task_name}")
-                    job.status = JobStatus.RUNNING
-                    job.last_run_time = now
-                    # Simulate job execution
-                    await asyncio.sleep(random.uniform(0.1, 1.0))
-                    # Simulate outcome
-                    if random.random() < 0.9:  # 90% success rate
-                        job.status = JobStatus.COMPLETED
-                    else:
-                        job.status = JobStatus.FAILED
-                        job.retries_left = (
-                            job.retries_left - 1 if job.retries_left > 0 else 0
-                        )
-                    job.updated_at = datetime.utcnow()
-
-                    # Reschedule if it's a recurring job
-                    if job.status == JobStatus.COMPLETED and (
-                        job.schedule.interval_seconds or job.schedule.cron_expression
-                    ):
-                        job.next_run_time = self._calculate_next_run(job.schedule)
-                        job.status = JobStatus.PENDING  # Reset status for next run
-                    elif job.status == JobStatus.FAILED and job.retries_left > 0:
-                        # Simple retry logic: schedule after delay
-                        job.next_run_time = now + timedelta(
-                            seconds=job.retry_delay_seconds
-                        )
-                        job.status = JobStatus.PENDING
-                    else:
-                        # Job is finished (completed one-off, failed with no retries)
-                        job.next_run_time = None
-
-                    self._jobs[job_id] = job  # Update mock store
-
-            await asyncio.sleep(10)  # Check every 10 seconds
+                    job.next_run_time = self._calculate_next_run(job.schedule)
+                    job.status = JobStatus.PENDING  # Reset status for next run
+                elif job.status == JobStatus.FAILED and job.retries_left > 0:
+                    # Simple retry logic: schedule after delay
+                    job.next_run_time = now + timedelta(seconds=job.retry_delay_seconds)
+                    job.status = JobStatus.PENDING
+                else:
+                    # Job is finished (completed one-off, failed with no retries)
+                    job.next_run_time = None
+
+                self._jobs[job_id] = job  # Update mock store
+                self._job_index.upsert(job)
+                self._push_due(job)
+
+            await self._store_job_states(
+                [job for job in due_jobs if job.id in self._jobs]
+            )
+
+            # Sleep until the next job is due, checking at least every 10 seconds
+            delay = 10.0
+            if self._due_heap:
+                delay = min(delay, self._due_heap[0][0] - datetime.utcnow().timestamp())
+            await asyncio.sleep(max(0.0, delay))
         logger.info("Mock scheduler loop stopped.")
 
+    async def _execute_job(self, job: Job) -> bool:
+        """
+        Run a job's task function on the worker pool.
+
+        Jobs whose task has no registered function have nothing to run; they are
+        simulated and reported as completed.
+
+        The timeout starts once a worker slot is free. A timed-out task cannot
+        be interrupted: its thread keeps running and holds its pool worker until
+        the function returns, even though the job is already reported as
+        failed, so SCHEDULER_WORKERS should leave room for slow tasks.
+
+        Args:
+            job: The job to run.
+
+        Returns:
+            bool: True if the task completed, False if it failed or timed out.
+        """
+        func = self._task_registry.get(job.task_name)
+        if func is None:
+            logger.info(
+                "No task registered for job {}: {}, simulating run",
+                job.id,
+                job.task_name,
+            )
+            return True
+
+        if self._run_slots is None:
+            self._run_slots = asyncio.Semaphore(settings.SCHEDULER_WORKERS)
+
+        call = functools.partial(func, *(job.args or ()), **(job.kwargs or {}))
+        try:
+            async with self._run_slots:
+                future = asyncio.get_running_loop().run_in_executor(self._pool, call)
+                await asyncio.wait_for(future, timeout=job.timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Job {} timed out after {} seconds", job.id, job.timeout_seconds
+            )
+            return False
+        except Exception as e:
+            logger.error("Job {} failed: {}", job.id, e)
+            return False
+        return True
+
+    async def _store_job_states(self, jobs: List[Job]):
+        """
+        Write the state of several jobs to Redis in a single round trip.
+
+        Each job is a hash at ``job:{id}``, so a transition only rewrites its
+        state fields rather than the whole job.
+
+        Args:
+            jobs: The jobs whose state changed.
+        """
+        if self._redis is None or not jobs:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for job in jobs:
+                    pipe.hset(
+                        f"job:{job.id}",
+                        mapping={
+                            "status": job.status.value,
+                            "last_run_time": (
+                                job.last_run_time.isoformat()
+                                if job.last_run_time
+                                else ""
+                            ),
+                            "next_run_time": (
+                                job.next_run_time.isoformat()
+                                if job.next_run_time
+                                else ""
+                            ),
+                            "retries_left": job.retries_left,
+                            "updated_at": job.updated_at.isoformat(),
+                        },
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis job state write failed for {} jobs: {}", len(jobs), e)
+
+    async def _delete_job_state(self, job_id: str):
+        """Remove a deleted job's state hash from Redis."""
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(f"job:{job_id}")
+        except Exception as e:
+            logger.warning("Redis job state delete failed for {}: {}", job_id, e)
+
+    def _push_due(self, job: Job):
+        """
+        Queue a job on the due heap if it has a next run time.
+
+        Every reschedule leaves a stale entry behind, so the heap is rebuilt
+        from its live entries once it holds more than twice as many entries
+        as there are jobs.
+
+        Args:
+            job: The job to queue.
+        """
+        if job.next_run_time:
+            heapq.heappush(self._due_heap, (job.next_run_time.timestamp(), job.id))
+        if len(self._due_heap) > 2 * max(len(self._jobs), self._MIN_HEAP_COMPACT):
+            self._compact_due_heap()
+
+    def _is_due_entry_live(self, run_ts: float, job_id: str) -> bool:
+        """Check that a due heap entry matches a pending job's next run time."""
+        job = self._jobs.get(job_id)
+        return (
+            job is not None
+            and job.status == JobStatus.PENDING
+            and job.next_run_time is not None
+            and job.next_run_time.timestamp() == run_ts
+        )
+
+    def _compact_due_heap(self):
+        """Rebuild the due heap without its stale entries."""
+        self._due_heap = [
+            entry for entry in set(self._due_heap) if self._is_due_entry_live(*entry)
+        ]
+        heapq.heapify(self._due_heap)
+
+    def _pop_due_jobs(self, now: datetime) -> List[str]:
+        """
+        Pop every job from the due heap whose run time has passed.
+
+        Entries are invalidated lazily: those for deleted, rescheduled or
+        non-pending jobs are discarded as they are popped.
+
+        Args:
+            now: The current time.
+
+        Returns:
+            List[str]: IDs of the jobs that are due, in run-time order.
+        """
+        now_ts = now.timestamp()
+        due: Dict[str, None] = {}
+        while self._due_heap and self._due_heap[0][0] <= now_ts:
+            run_ts, job_id = heapq.heappop(self._due_heap)
+            if self._is_due_entry_live(run_ts, job_id):
+                due[job_id] = None
+        return list(due)
+
     async def stop_scheduler(self):
         """Stop the mock scheduler loop."""
         self._scheduler_running = False
+
+    async def close(self):
+        """Stop the scheduler loop and shut down the worker pool."""
+        await self.stop_scheduler()
+        self._pool.shutdown(wait=False)
+        self._run_slots = None
@@ -0,0 +1,126 @@
+"""
+Shared helpers for LlamaSearch AI services.
+"""
+
+import heapq
+import json
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, List, Optional, TypeVar, Union
+
+from llamasearchai.config.settings import settings
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+try:
+    # Use orjson to serialize cache payloads if available
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    # Redis is optional; without it the services keep their state in-process
+    import redis.asyncio as aioredis
+
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+T = TypeVar("T")
+
+# Pre-generated request IDs (32 hex characters each), refilled in batches
+_REQUEST_ID_BATCH = 256
+_request_ids: Deque[str] = deque()
+
+# Forked workers must not hand out IDs drawn by the parent process
+os.register_at_fork(after_in_child=_request_ids.clear)
+
+
+def new_request_id() -> str:
+    """
+    Return a random 128-bit request ID as 32 hex characters.
+
+    IDs are cut from one batched os.urandom call, which is cheaper than a
+    uuid4() per request. Use uuid4() for identifiers stored as primary keys.
+
+    Returns:
+        str: The request ID.
+    """
+    if not _request_ids:
+        buf = os.urandom(16 * _REQUEST_ID_BATCH).hex()
+        _request_ids.extend(buf[i : i + 32] for i in range(0, len(buf), 32))
+    return _request_ids.popleft()
+
+
+def create_redis_client() -> Optional["aioredis.Redis"]:
+    """
+    Create the Redis client shared by the services, if Redis is configured.
+
+    Like the HTTP client, it should be created once per event loop, typically
+    at application startup, and closed at shutdown.
+
+    Returns:
+        Optional[aioredis.Redis]: The client, or None if REDIS_URL is not set or
+            the redis package is not installed.
+    """
+    if not settings.REDIS_URL or not HAS_REDIS:
+        return None
+    return aioredis.Redis.from_url(settings.REDIS_URL)
+
+
+def paginate(
+    items: Iterable[T],
+    key: Callable[[T], Any],
+    offset: int,
+    limit: int,
+    predicate: Optional[Callable[[T], bool]] = None,
+) -> List[T]:
+    """
+    Return one page of items ordered by ``key`` (largest first).
+
+    Only the first ``offset + limit`` items are ever ordered, so a page near the
+    front of a large collection avoids a full sort.
+
+    Args:
+        items: The items to paginate.
+        key: Sort key; items are returned in descending order of this key.
+        offset: Number of items to skip.
+        limit: Maximum number of items to return.
+        predicate: Optional filter applied before ordering.
+
+    Returns:
+        List[T]: The requested page of items.
+    """
+    if predicate is not None:
+        items = (item for item in items if predicate(item))
+    return heapq.nlargest(offset + limit, items, key=key)[offset:]
+
+
+def dump_models(value: Union[BaseModel, Iterable[BaseModel]]) -> Union[str, bytes]:
+    """
+    Serialize a model, or a list of models, to JSON.
+
+    The models are converted to plain data once and encoded with orjson when it
+    is installed, otherwise with the standard library and Pydantic's encoder.
+    Either result can be read back with ``parse_raw`` / ``parse_raw_as``.
+
+    Args:
+        value: The model or models to serialize.
+
+    Returns:
+        Union[str, bytes]: The JSON document.
+    """
+    if isinstance(value, BaseModel):
+        data = value.dict()
+    else:
+        data = [item.dict() for item in value]
+
+    if HAS_ORJSON:
+        # Types orjson does not support natively, such as sets, are converted by
+        # Pydantic's encoder
+        return orjson.dumps(
+            data, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, default=pydantic_encoder)
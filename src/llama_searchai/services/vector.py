@@ -5,17 +5,21 @@ This module implements the business logic for vector-related operations,
 such as creating embeddings and performing vector search.
 """
 
+import base64
+import hashlib
 import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import numpy as np
 from loguru import logger
 
 try:
-    # Try to import MLX for Apple Silicon optimization if available
-    import mlx.core as mx
+    # Try to import MLX for Apple Silicon model inference if available
+    import mlx.core as mx  # noqa: F401
 
     HAS_MLX = True
 except ImportError:
@@ -30,12 +34,253 @@ from llamasearchai.models.vector import (
     EmbedResponse,
     UpsertVectorsRequest,
     UpsertVectorsResponse,
+    VectorPrecision,
     VectorRecord,
     VectorSearchMetadata,
     VectorSearchRequest,
     VectorSearchResponse,
 )
 
+# Embedding dimensions of known models
+_MODEL_DIMENSIONS = MappingProxyType(
+    {
+        "text-embedding-ada-002": 1536,
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "gpt-3.5-turbo": 1536,
+        "gpt-4": 1536,
+        "all-mpnet-base-v2": 768,
+        "all-MiniLM-L6-v2": 384,
+    }
+)
+
+
+def _encode_vectors(
+    vectors: np.ndarray, precision: VectorPrecision
+) -> Tuple[List[Any], List[Optional[float]]]:
+    """
+    Encode embedding vectors for a response.
+
+    fp16 and int8 vectors are sent as base64 of their raw little-endian bytes,
+    a half and a quarter of the size of the float32 values, and a fraction of
+    the size of the same values written out as JSON numbers.
+
+    Args:
+        vectors: The vectors, one per row.
+        precision: The encoding to use.
+
+    Returns:
+        The encoded vectors, and the int8 scale of each (None otherwise).
+    """
+    if precision == VectorPrecision.FP32:
+        return vectors.tolist(), [None] * len(vectors)
+
+    if precision == VectorPrecision.FP16:
+        encoded = vectors.astype("<f2")
+        scales = [None] * len(vectors)
+    else:
+        # Symmetric per-row scale mapping the largest magnitude to 127
+        row_scales = np.abs(vectors).max(axis=1) / 127.0
+        row_scales[row_scales == 0] = 1.0
+        encoded = np.rint(vectors / row_scales[:, None]).astype(np.int8)
+        scales = row_scales.tolist()
+
+    return [base64.b64encode(row).decode("ascii") for row in encoded], scales
+
+
+class _VectorMatrix:
+    """
+    In-memory store of a collection's vectors for exact similarity search.
+
+    Vectors are kept as rows of one contiguous float32 matrix alongside their
+    norms, so scoring a query against the whole collection is a single
+    matrix-vector product. Rows are appended in place, growing the matrix in
+    blocks.
+
+    With quantization enabled, rows are stored as int8 with a per-row scale,
+    using a quarter of the memory; they are scored a block of rows at a time so
+    the float32 working copy stays small.
+    """
+
+    _GROW_BY = 1024
+    _SCORE_BLOCK = 8192
+
+    def __init__(self, dimension: int, quantize: bool = False):
+        """
+        Initialize an empty store.
+
+        Args:
+            dimension: Number of dimensions of the stored vectors.
+            quantize: Whether to store the vectors as int8.
+        """
+        self.dimension = dimension
+        self._quantize = quantize
+        self._size = 0
+        self._matrix = np.empty(
+            (0, dimension), dtype=np.int8 if quantize else np.float32
+        )
+        self._scales = np.empty(0, dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._ids: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored vectors."""
+        return self._size
+
+    def _reserve(self, size: int):
+        """Grow the matrix so that it can hold at least ``size`` rows."""
+        if size <= len(self._matrix):
+            return
+        capacity = max(size, len(self._matrix) + self._GROW_BY)
+        matrix = np.empty((capacity, self.dimension), dtype=self._matrix.dtype)
+        matrix[: self._size] = self._matrix[: self._size]
+        scales = np.empty(capacity, dtype=np.float32)
+        scales[: self._size] = self._scales[: self._size]
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[: self._size] = self._norms[: self._size]
+        self._matrix, self._scales, self._norms = matrix, scales, norms
+
+    def upsert(self, records: List[VectorRecord]) -> Tuple[int, int]:
+        """
+        Insert or replace vectors by record ID.
+
+        Records without a vector are ignored; if an ID appears more than once,
+        the last record wins.
+
+        Args:
+            records: The records to store.
+
+        Returns:
+            Tuple of the number of inserted and updated vectors.
+
+        Raises:
+            ValueError: If a vector has the wrong number of dimensions.
+        """
+        latest = {record.id: record for record in records if record.vector}
+        if not latest:
+            return 0, 0
+        vectors = np.array(
+            [record.vector for record in latest.values()], dtype=np.float32
+        )
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Vectors must have {self.dimension} dimensions")
+
+        rows = []
+        inserted = 0
+        for record in latest.values():
+            row = self._rows.get(record.id)
+            if row is None:
+                row = self._size + inserted
+                inserted += 1
+                self._rows[record.id] = row
+                self._ids.append(record.id)
+                self._metadata.append(record.metadata)
+            else:
+                self._metadata[row] = record.metadata
+            rows.append(row)
+
+        self._reserve(self._size + inserted)
+        self._size += inserted
+        self._norms[rows] = np.linalg.norm(vectors, axis=1)
+        if self._quantize:
+            # Symmetric per-row scale mapping the largest magnitude to 127
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._scales[rows] = scales
+            self._matrix[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+        else:
+            self._matrix[rows] = vectors
+        return inserted, len(rows) - inserted
+
+    def search(
+        self,
+        query: List[float],
+        k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Find the stored vectors most similar to a query by cosine similarity.
+
+        Args:
+            query: The query vector.
+            k: Maximum number of matches to return.
+            metadata_filter: Optional metadata values that matches must have.
+
+        Returns:
+            Tuple of the matching rows and their scores, best first, and the
+            number of vectors excluded by the filter.
+
+        Raises:
+            ValueError: If the query has the wrong number of dimensions.
+        """
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape != (self.dimension,):
+            raise ValueError(f"Query must have {self.dimension} dimensions")
+
+        n = self._size
+        if self._quantize:
+            scores = np.empty(n, dtype=np.float32)
+            for start in range(0, n, self._SCORE_BLOCK):
+                stop = min(start + self._SCORE_BLOCK, n)
+                block = self._matrix[start:stop].astype(np.float32)
+                scores[start:stop] = block @ q
+            scores *= self._scales[:n]
+        else:
+            scores = self._matrix[:n] @ q
+        norms = self._norms[:n] * (np.linalg.norm(q) or 1.0)
+        np.divide(scores, norms, out=scores, where=norms > 0)
+
+        filtered = 0
+        if metadata_filter:
+            keep = np.fromiter(
+                (
+                    all(
+                        meta.get(key) == value for key, value in metadata_filter.items()
+                    )
+                    for meta in self._metadata
+                ),
+                dtype=bool,
+                count=n,
+            )
+            filtered = n - int(np.count_nonzero(keep))
+            scores[~keep] = -np.inf
+
+        k = min(k, n - filtered)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32), filtered
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top], filtered
+
+    def record(
+        self, row: int, score: float, include_vector: bool = False
+    ) -> VectorRecord:
+        """
+        Build a search result for the record stored in a row.
+
+        Args:
+            row: The row to read.
+            score: The similarity score of the row.
+            include_vector: Whether to include the vector values.
+
+        Returns:
+            VectorRecord: The stored record with its score.
+        """
+        vector = None
+        if include_vector:
+            vector = self._matrix[row].astype(np.float32)
+            if self._quantize:
+                vector *= self._scales[row]
+            vector = vector.tolist()
+        return VectorRecord.construct(
+            id=self._ids[row],
+            vector=vector,
+            score=score,
+            metadata=self._metadata[row],
+        )
+
 
 class VectorService:
     """
@@ -54,6 +299,8 @@ class VectorService:
         self._use_mlx = settings.USE_MLX and HAS_MLX
         self._embedding_models = {}
         self._collections = {}
+        self._rng = np.random.default_rng()
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
 
         # In a full implementation, this would initialize the vector DB client
         # and load any pre-trained embedding models
@@ -87,31 +334,27 @@ class VectorService:
         # Determine embedding dimension based on the model
         embedding_dim = self._get_embedding_dimension(model)
 
-        # Create embeddings
-        embeddings = []
-        for text in texts:
-            # Generate a random vector as a placeholder
-            # In production, this would call the actual embedding model
-            if self._use_mlx:
-                # Use MLX for faster vector operations on Apple Silicon
-                vector = mx.random.normal(shape=(embedding_dim,)).tolist()
-            else:
-                # Use NumPy for standard vector operations
-                vector = np.random.randn(embedding_dim).tolist()
+        vectors = self._embed_texts(texts, model, embedding_dim)
 
-            # Normalize if requested
-            if request.normalize:
-                norm = np.linalg.norm(vector)
-                vector = [v / norm for v in vector]
+        # Normalize each row if requested
+        if request.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors)
 
-            # Create the embedding object
-            embedding = Embedding(
+        encoded, scales = _encode_vectors(vectors, request.precision)
+
+        # Create the embedding objects, skipping validation of the generated vectors
+        embeddings = [
+            Embedding.construct(
                 vector=vector,
                 text=text,
                 model=model,
                 dimensions=embedding_dim,
+                precision=request.precision,
+                scale=scale,
             )
-            embeddings.append(embedding)
+            for text, vector, scale in zip(texts, encoded, scales)
+        ]
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -150,12 +393,19 @@ class VectorService:
 
         # Record start time
         start_time = time.time()
+        now_iso = datetime.utcnow().isoformat()
 
         # Handle query: convert text to vector if needed
         query_vector = None
         if isinstance(request.query, str):
-            # Convert text to embedding
-            embed_request = EmbedRequest(text=request.query)
+            # Convert text to embedding, with a model whose vectors have the
+            # dimensions of the collection's
+            model = self._default_model
+            if request.collection in self._collections:
+                model = self._get_model_for_dimension(
+                    self._collections[request.collection]["dimension"]
+                )
+            embed_request = EmbedRequest(text=request.query, model=model)
             embed_response = await self.create_embeddings(embed_request)
             query_vector = embed_response.embeddings[0].vector
         else:
@@ -170,44 +420,24 @@ class VectorService:
                 "dimension": len(query_vector),
                 "index_type": "hnsw",
                 "vector_count": 1000,
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": now_iso,
             }
 
         # TODO: In production, perform actual vector search against the DB
-        # For now, create mock results for development
-
-        # Create sample results
-        results = []
-        for i in range(request.num_results):
-            # Create a random vector as a placeholder
-            if self._use_mlx:
-                vector = mx.random.normal(shape=(len(query_vector),)).tolist()
-            else:
-                vector = np.random.randn(len(query_vector)).tolist()
-
-            # Calculate a mock similarity score
-            # In production, this would come from the vector DB
-            score = 0.95 - (i * 0.05)
-
-            # Create sample metadata
-            metadata = {
-                "title": f"Document {i+1}",
-                "url": f"https://example.com/doc{i+1}",
-                "timestamp": datetime.utcnow().isoformat(),
-                "summary": f"This is a summary of document {i+1} related to the query.",
-                "tags": ["sample", "test", f"tag{i}"],
-            }
-
-            # Create the vector record
-            record = VectorRecord(
-                id=f"doc-{uuid4()}",
-                vector=(
-                    vector if request.parameters.get("include_vectors", False) else None
-                ),
-                score=score,
-                metadata=metadata,
+        # For development, search the vectors upserted into the collection, or
+        # create mock results if there are none
+        include_vectors = request.parameters.get("include_vectors", False)
+        store = self._collections[request.collection].get("store")
+        if store:
+            rows, scores, filtered_vectors = store.search(
+                query_vector, request.num_results, request.filter
             )
-            results.append(record)
+            results = [
+                store.record(row, score, include_vectors)
+                for row, score in zip(rows.tolist(), scores.tolist())
+            ]
+        else:
+            results = self._mock_search_results(request, len(query_vector), now_iso)
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -216,18 +446,21 @@ class VectorService:
         collection_info = self._collections.get(request.collection, {})
         vector_dim = collection_info.get("dimension", len(query_vector))
         index_type = collection_info.get("index_type", "hnsw")
-        total_vectors = collection_info.get("vector_count", 1000)
+        if store:
+            total_vectors = len(store)
+        else:
+            total_vectors = collection_info.get("vector_count", 1000)
 
-        # Calculate filtered vectors if filter is provided
-        filtered_vectors = 0
-        if request.filter:
-            filtered_vectors = int(total_vectors * 0.3)  # Mock 30% filtered
+            # Calculate filtered vectors if filter is provided
+            filtered_vectors = 0
+            if request.filter:
+                filtered_vectors = int(total_vectors * 0.3)  # Mock 30% filtered
 
         # Create metadata
         metadata = VectorSearchMetadata(
             processing_time=processing_time,
             request_id=str(uuid4()),
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=now_iso,
             version="0.1.0",
             source="llamasearch-api",
             collection=request.collection,
@@ -243,6 +476,56 @@ class VectorService:
             metadata=metadata,
         )
 
+    def _mock_search_results(
+        self, request: VectorSearchRequest, dimension: int, timestamp: str
+    ) -> List[VectorRecord]:
+        """
+        Create mock search results for a collection without stored vectors.
+
+        Args:
+            request: The vector search request.
+            dimension: Number of dimensions of the query vector.
+            timestamp: ISO timestamp to give every mock document.
+
+        Returns:
+            List of mock vector records.
+        """
+        # Random placeholder vectors, only generated if they are returned
+        vectors = [None] * request.num_results
+        if request.parameters.get("include_vectors", False):
+            vectors = self._rng.standard_normal(
+                (request.num_results, dimension), dtype=np.float32
+            ).tolist()
+
+        # Mock relevance decays with rank and is squashed into (0, 1) with a
+        # sigmoid, computed for all results at once
+        # In production, raw scores would come from the vector DB
+        raw_scores = 0.95 - 0.05 * np.arange(request.num_results)
+        scores = (1.0 / (1.0 + np.exp(-raw_scores))).tolist()
+
+        # Create sample results
+        results = []
+        for i in range(request.num_results):
+            # Create sample metadata
+            metadata = {
+                "title": f"Document {i+1}",
+                "url": f"https://example.com/doc{i+1}",
+                "timestamp": timestamp,
+                "summary": f"This is a summary of document {i+1} related to the query.",
+                "tags": ["sample", "test", f"tag{i}"],
+            }
+
+            # Create the vector record
+            record = VectorRecord.construct(
+                id=f"doc-{uuid4()}",
+                vector=vectors[i],
+                score=scores[i],
+                metadata=metadata,
+            )
+            results.append(record)
+
+        return results
+
     async def upsert_vectors(
         self, request: UpsertVectorsRequest
     ) -> UpsertVectorsResponse:
@@ -260,6 +543,7 @@ class VectorService:
 
         # Record start time
         start_time = time.time()
+        now_iso = datetime.utcnow().isoformat()
 
         # Check if collection exists
         if request.collection not in self._collections:
@@ -281,29 +565,28 @@ class VectorService:
                 "dimension": vector_dim,
                 "index_type": "hnsw",
                 "vector_count": 0,
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": now_iso,
             }
 
         # TODO: In production, actually upsert vectors to the DB
-        # For now, simulate the operation for development
-
-        # Update the mock collection stats
-        if request.collection in self._collections:
-            collection_info = self._collections[request.collection]
-            collection_info["vector_count"] += len(request.vectors)
+        # For development, keep them in the collection's in-memory store
+        collection_info = self._collections[request.collection]
+        store = collection_info.get("store")
+        if store is None:
+            store = collection_info["store"] = _VectorMatrix(
+                collection_info["dimension"], settings.VECTOR_QUANTIZE_INT8
+            )
+        inserted_count, updated_count = store.upsert(request.vectors)
+        collection_info["vector_count"] += inserted_count
 
         # Calculate processing time
         processing_time = time.time() - start_time
 
-        # For development, assume half are inserts and half are updates
-        inserted_count = len(request.vectors) // 2
-        updated_count = len(request.vectors) - inserted_count
-
         # Create metadata
         metadata = Metadata(
             processing_time=processing_time,
             request_id=str(uuid4()),
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=now_iso,
             version="0.1.0",
             source="llamasearch-api",
         )
@@ -356,6 +639,7 @@ class VectorService:
             }
 
         # Convert the collections to the expected format
+        now_iso = datetime.utcnow().isoformat()
         collections_list = []
         for name, info in self._collections.items():
             collections_list.append(
@@ -363,7 +647,7 @@ class VectorService:
                     "name": name,
                     "vector_count": info.get("vector_count", 0),
                     "dimension": info.get("dimension", 384),
-                    "created_at": info.get("created_at", datetime.utcnow().isoformat()),
+                    "created_at": info.get("created_at", now_iso),
                     "metadata": {
                         "description": info.get("description", f"Collection {name}"),
                         "index_type": info.get("index_type", "hnsw"),
@@ -378,6 +662,58 @@ class VectorService:
             "database_type": self._vector_db_type,
         }
 
+    def _embed_texts(
+        self, texts: List[str], model: str, embedding_dim: int
+    ) -> np.ndarray:
+        """
+        Get the raw embedding vectors of texts, reusing cached vectors.
+
+        Vectors are cached in memory, least recently used first out, under the
+        SHA-256 of the model name and text; only texts not in the cache are
+        sent to the model, once each, in order of length.
+
+        Args:
+            texts: The texts to embed.
+            model: The embedding model.
+            embedding_dim: The embedding dimension of the model.
+
+        Returns:
+            A new float32 array with one row per text, safe to modify in place.
+        """
+        cache = self._embedding_cache
+        vectors = np.empty((len(texts), embedding_dim), dtype=np.float32)
+        missing: Dict[bytes, List[int]] = {}
+
+        for row, text in enumerate(texts):
+            key = hashlib.sha256(f"{model}\x00{text}".encode()).digest()
+            cached = cache.get(key)
+            if cached is None:
+                missing.setdefault(key, []).append(row)
+            else:
+                cache.move_to_end(key)
+                vectors[row] = cached
+
+        if missing:
+            # Embed the uncached texts shortest first, so each model batch holds
+            # texts of similar length and needs little padding; the vectors are
+            # written back to the rows of their texts
+            pending = sorted(missing.items(), key=lambda item: len(texts[item[1][0]]))
+
+            # Generate random vectors for the uncached texts as a placeholder
+            # In production, this would call the actual embedding model
+            # MLX is reserved for model inference; for random data the device
+            # round trip costs more than generating the values on the host
+            generated = self._rng.standard_normal(
+                (len(pending), embedding_dim), dtype=np.float32
+            )
+            for vector, (key, rows) in zip(generated, pending):
+                vectors[rows] = vector
+                cache[key] = vector
+            while len(cache) > settings.EMBEDDING_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return vectors
+
     def _get_embedding_dimension(self, model: str) -> int:
         """
         Get the embedding dimension for a specific model.
@@ -388,15 +724,25 @@ class VectorService:
         Returns:
             The embedding dimension.
         """
-        # Map of model names to their dimensions
-        model_dimensions = {
-            "text-embedding-ada-002": 1536,
-            "text-embedding-3-small": 1536,
-            "text-embedding-3-large": 3072,
-            "gpt-3.5-turbo": 1536,
-            "gpt-4": 1536,
-            "all-mpnet-base-v2": 768,
-            "all-MiniLM-L6-v2": 384,
-        }
+        return _MODEL_DIMENSIONS.get(model, 384)  # Default to 384 if unknown
+
+    def _get_model_for_dimension(self, dimension: int) -> str:
+        """
+        Get an embedding model producing vectors of a given dimension.
+
+        Args:
+            dimension: The embedding dimension.
+
+        Returns:
+            The default model if it has that dimension, else the first known
+            model that does.
 
-        return model_dimensions.get(model, 384)  # Default to 384 if unknown
+        Raises:
+            ValueError: If no known model has that dimension.
+        """
+        if self._get_embedding_dimension(self._default_model) == dimension:
+            return self._default_model
+        for model, model_dimension in _MODEL_DIMENSIONS.items():
+            if model_dimension == dimension:
+                return model
+        raise ValueError(f"No embedding model produces {dimension}-dimensional vectors")
@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the LlamaSearch AI tests.
+"""
+
+import pytest
+from fastapi import HTTPException, Security, status
+from llamasearchai.api.app import api_key_header, create_app, get_api_key
+from llamasearchai.config.settings import settings
+
+
+# Override API key dependency for testing: only the test key is valid
+def get_test_api_key(api_key: str = Security(api_key_header)):
+    if api_key != "test-api-key":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key",
+        )
+    return api_key
+
+
+@pytest.fixture(scope="session")
+def search_providers():
+    """
+    Configure Google and Bing for the session.
+
+    Search fails when no provider is configured; with credentials set, the
+    providers return mock results without any network calls.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "GOOGLE_API_KEY", "test-google-key")
+        mp.setattr(settings, "GOOGLE_CX", "test-google-cx")
+        mp.setattr(settings, "BING_API_KEY", "test-bing-key")
+        yield ["google", "bing"]
+
+
+@pytest.fixture(scope="session")
+def asgi_app(search_providers):
+    """Create the app once per test session (per worker under pytest-xdist)."""
+    app = create_app()
+    app.dependency_overrides[get_api_key] = get_test_api_key
+    return app
@@ -2,230 +2,450 @@
 Tests for the LlamaSearch AI API.
 """
 
-from fastapi.testclient import TestClient
-from llamasearchai.api.app import app, get_api_key
+import asyncio
+import base64
+import os
+
+import numpy as np
+import orjson
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient, Limits, Response
+from llamasearchai.api.app import create_app, get_api_key
 from llamasearchai.config.settings import settings
+from llamasearchai.models.common import HealthResponse
+from llamasearchai.models.personalization import (
+    PersonalizationResponse,
+    UserFeedbackResponse,
+    UserProfile,
+)
+from llamasearchai.models.search import Query, SearchResponse
+from llamasearchai.models.vector import EmbedResponse, VectorSearchResponse
+from llamasearchai.services.search import SearchService
+from llamasearchai.services.utils import HAS_REDIS
+
+AUTH_HEADERS = {settings.API_KEY_HEADER: "test-api-key"}
+JSON_HEADERS = {"content-type": "application/json"}
+BATCH_HEADERS = {**AUTH_HEADERS, **JSON_HEADERS}
+
+# Run against a live server instead of in-process, e.g. for a staging smoke test
+LIVE_URL = os.getenv("LLAMA_TEST_BASE_URL")
+
+# All tests share the event loop of the session-scoped client
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+USER_ID = "test_user"
+ANALYZE_QUERY = "python fastapi tutorial"
+
+SEARCH_REQUEST = {
+    "query": {
+        "text": "python fastapi tutorial",
+        "intent": "informational",
+        "language": "en",
+    },
+    "num_results": 5,
+    "providers": ["google", "bing"],
+}
+
+EMBED_REQUEST = {
+    "text": ["Python is a programming language", "FastAPI is a web framework"],
+    "model": "text-embedding-ada-002",
+    "normalize": True,
+    "precision": "fp16",
+}
+
+# Texts of mixed lengths, which the server embeds shortest first; the last one
+# repeats the first
+MIXED_EMBED_REQUEST = {
+    "text": [f"{'Python ' * ((i * 7) % 16)}text {i}" for i in range(15)] + ["text 0"],
+    "model": "all-MiniLM-L6-v2",
+}
+
+VECTOR_SEARCH_REQUEST = {
+    "query": "Python programming",
+    "collection": "test_collection",
+    "num_results": 5,
+}
+
+PERSONALIZATION_REQUEST = {
+    "user_id": USER_ID,
+    "content": [
+        {
+            "id": "result1",
+            "title": "Python Tutorial",
+            "url": "https://example.com/python",
+            "score": 0.95,
+        },
+        {
+            "id": "result2",
+            "title": "FastAPI Documentation",
+            "url": "https://example.com/fastapi",
+            "score": 0.90,
+        },
+    ],
+    "context": {"query": "python tutorial"},
+}
+
+FEEDBACK_REQUEST = {
+    "user_id": USER_ID,
+    "item_id": "result1",
+    "rating": 4.5,
+    "feedback_text": "Very helpful tutorial",
+    "source": "search",
+    "context": {"query": "python tutorial"},
+}
+
+BATCH_REQUEST = {
+    "requests": {
+        "search": SEARCH_REQUEST,
+        "embed": EMBED_REQUEST,
+        "rerank": PERSONALIZATION_REQUEST,
+    }
+}
+
+# Request bodies are encoded once; the dicts above are only read by the checks
+SEARCH_BODY = orjson.dumps(SEARCH_REQUEST)
+EMBED_BODY = orjson.dumps(EMBED_REQUEST)
+MIXED_EMBED_BODY = orjson.dumps(MIXED_EMBED_REQUEST)
+VECTOR_SEARCH_BODY = orjson.dumps(VECTOR_SEARCH_REQUEST)
+PERSONALIZATION_BODY = orjson.dumps(PERSONALIZATION_REQUEST)
+FEEDBACK_BODY = orjson.dumps(FEEDBACK_REQUEST)
+BATCH_BODY = orjson.dumps(BATCH_REQUEST)
+
+
+def _post(client, path, body):
+    """Send a JSON body already encoded to bytes."""
+    return client.post(path, content=body, headers=JSON_HEADERS)
+
+
+def _json(response):
+    """Decode a JSON response with orjson."""
+    return orjson.loads(response.content)
+
+
+async def _asgi_call(app, method, path, body=b"", headers=AUTH_HEADERS):
+    """
+    Call the app directly with a minimal ASGI scope, bypassing httpx.
+
+    Only suitable for endpoints that return their whole body in one response,
+    since the app is never told the client disconnected.
+    """
+    path, _, query_string = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+        "client": ("test", 123),
+        "server": ("test", 80),
+    }
 
-
-# Override API key dependency for testing
-def get_test_api_key():
-    return "test-api-key"
+    received = asyncio.Queue()
+    received.put_nowait({"type": "http.request", "body": body, "more_body": False})
+    sent = asyncio.Queue()
+
+    await app(scope, received.get, sent.put)
+
+    start = sent.get_nowait()
+    chunks = []
+    while not sent.empty():
+        chunks.append(sent.get_nowait().get("body", b""))
+    return Response(start["status"], headers=start["headers"], content=b"".join(chunks))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(asgi_app):
+    """
+    Create one client for the whole session.
+
+    By default the client calls the app in-process, without a socket. With
+    LLAMA_TEST_BASE_URL set, it talks to that server over pooled keep-alive
+    HTTP/2 connections (which needs the h2 package).
+    """
+    if LIVE_URL:
+        client = AsyncClient(
+            base_url=LIVE_URL,
+            http2=True,
+            headers=AUTH_HEADERS,
+            limits=Limits(max_keepalive_connections=20),
+        )
+    else:
+        client = AsyncClient(
+            transport=ASGITransport(app=asgi_app),
+            base_url="http://test",
+            headers=AUTH_HEADERS,
+        )
+    async with client:
+        yield client
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def primed_embeddings(client):
+    """Embed EMBED_REQUEST once so later requests for it hit the server cache."""
+    response = await _post(client, "/api/v1/vector/embed", EMBED_BODY)
+    _check_embed(response)
+    return [embedding["vector"] for embedding in _json(response)["embeddings"]]
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def warm_user(client):
+    """Load the test user's profile once, so later requests find it cached."""
+    response = await client.get(f"/api/v1/personalization/profile/{USER_ID}")
+    _check_profile(response)
+    return USER_ID
+
+
+def _check_health(response):
+    assert response.status_code == 200
+    health = HealthResponse.parse_obj(_json(response))
+    assert health.status == "ok"
+    assert "uptime" in health.__fields_set__
 
 
-app.dependency_overrides[get_api_key] = get_test_api_key
-client = TestClient(app)
+def _check_validate(response):
+    assert response.status_code == 200
+    data = _json(response)
+    assert data["valid"] is True
 
 
-def test_health_check():
-    """Test the health check endpoint."""
-    response = client.get("/health")
+def _check_search(response):
     assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "ok"
-    assert "version" in data
-    assert "uptime" in data
+    search = SearchResponse.parse_obj(_json(response))
+    assert len(search.results) <= SEARCH_REQUEST["num_results"]
+    assert search.query.text == SEARCH_REQUEST["query"]["text"]
 
 
-def test_validate_api_key():
-    """Test API key validation."""
-    # Valid API key
-    response = client.get(
-        "/api/v1/validate",
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
+def _check_analyze(response):
     assert response.status_code == 200
-    data = response.json()
-    assert data["valid"] is True
+    query = Query.parse_obj(_json(response))
+    assert query.text == ANALYZE_QUERY
+    assert {"intent", "locality", "language"} <= query.__fields_set__
 
-    # Invalid API key
-    response = client.get(
-        "/api/v1/validate",
-        headers={settings.API_KEY_HEADER: "invalid-key"},
-    )
-    assert response.status_code == 401
 
+def _check_embed(response):
+    assert response.status_code == 200
+    embed = EmbedResponse.parse_obj(_json(response))
+    assert len(embed.embeddings) == len(EMBED_REQUEST["text"])
+    assert embed.metadata.model == EMBED_REQUEST["model"]
 
-def test_search_endpoint():
-    """Test the search endpoint."""
-    search_request = {
-        "query": {
-            "text": "python fastapi tutorial",
-            "intent": "informational",
-            "language": "en",
-        },
-        "num_results": 5,
-        "providers": ["google", "bing"],
-    }
+    # Check each embedding
+    for text, embedding in zip(EMBED_REQUEST["text"], embed.embeddings):
+        assert embedding.text == text
+        assert embedding.model == EMBED_REQUEST["model"]
+        assert embedding.precision == EMBED_REQUEST["precision"]
+        vector = np.frombuffer(base64.b64decode(embedding.vector), dtype="<f2")
+        assert vector.shape[0] == embedding.dimensions
 
-    response = client.post(
-        "/api/v1/search/",
-        json=search_request,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
 
+def _check_vector_search(response):
     assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) <= search_request["num_results"]
-    assert "metadata" in data
-    assert "query" in data
-    assert data["query"]["text"] == search_request["query"]["text"]
+    search = VectorSearchResponse.parse_obj(_json(response))
+    assert len(search.results) <= VECTOR_SEARCH_REQUEST["num_results"]
+    assert search.metadata.collection == VECTOR_SEARCH_REQUEST["collection"]
 
 
-def test_analyze_query():
-    """Test the query analysis endpoint."""
-    query = "python fastapi tutorial"
+def _check_profile(response):
+    assert response.status_code == 200
+    profile = UserProfile.parse_obj(_json(response))
+    assert profile.user_id == USER_ID
+    assert {"preferences", "topics_of_interest"} <= profile.__fields_set__
 
-    response = client.get(
-        f"/api/v1/search/analyze?query={query}",
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
 
+def _check_personalization(response):
     assert response.status_code == 200
-    data = response.json()
-    assert data["text"] == query
-    assert "intent" in data
-    assert "locality" in data
-    assert "language" in data
+    personalized = PersonalizationResponse.parse_obj(_json(response))
+    assert len(personalized.results) == len(PERSONALIZATION_REQUEST["content"])
+    assert len(personalized.content) == len(PERSONALIZATION_REQUEST["content"])
 
 
-def test_embed_endpoint():
-    """Test the embedding endpoint."""
-    embed_request = {
-        "text": ["Python is a programming language", "FastAPI is a web framework"],
-        "model": "text-embedding-ada-002",
-        "normalize": True,
+def _check_feedback(response):
+    assert response.status_code == 200
+    feedback = UserFeedbackResponse.parse_obj(_json(response))
+    assert feedback.status == "success"
+
+
+async def test_api_surface_concurrent(client, warm_user):
+    """
+    Test the independent endpoints with all requests in flight at once.
+
+    Endpoints with checks of their own in a dedicated test are left out.
+    """
+    checks = [
+        (
+            _post(client, "/api/v1/search/", SEARCH_BODY),
+            _check_search,
+        ),
+        (
+            client.get(f"/api/v1/search/analyze?query={ANALYZE_QUERY}"),
+            _check_analyze,
+        ),
+        (
+            _post(client, "/api/v1/vector/search", VECTOR_SEARCH_BODY),
+            _check_vector_search,
+        ),
+        (
+            _post(client, "/api/v1/personalization/rerank", PERSONALIZATION_BODY),
+            _check_personalization,
+        ),
+        (
+            _post(client, "/api/v1/personalization/feedback", FEEDBACK_BODY),
+            _check_feedback,
+        ),
+    ]
+
+    responses = await asyncio.gather(*(request for request, _ in checks))
+    for response, (_, check) in zip(responses, checks):
+        check(response)
+
+
+async def test_batch_surface(client):
+    """Test search, embedding and reranking through one batch request."""
+    response = await _post(client, "/api/v1/batch", BATCH_BODY)
+
+    assert response.status_code == 200
+    responses = _json(response)["responses"]
+    assert set(responses) == set(BATCH_REQUEST["requests"])
+
+    # Check each sub-response as if it came from its own endpoint
+    checks = {
+        "search": _check_search,
+        "embed": _check_embed,
+        "rerank": _check_personalization,
     }
+    for name, check in checks.items():
+        result = responses[name]
+        check(Response(result["status"], json=result["body"]))
 
-    response = client.post(
-        "/api/v1/vector/embed",
-        json=embed_request,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
+
+async def test_batch_respects_feature_flags(monkeypatch):
+    """Test that a batch cannot reach an endpoint whose feature is disabled."""
+    monkeypatch.setitem(settings.FEATURES, "personalization", False)
+    app = create_app()
+    app.dependency_overrides[get_api_key] = lambda: "test-api-key"
+    body = orjson.dumps({"requests": {"rerank": PERSONALIZATION_REQUEST}})
+
+    response = await _asgi_call(app, "POST", "/api/v1/batch", body, BATCH_HEADERS)
 
     assert response.status_code == 200
-    data = response.json()
-    assert "embeddings" in data
-    assert len(data["embeddings"]) == len(embed_request["text"])
-    assert "metadata" in data
-    assert data["metadata"]["model"] == embed_request["model"]
+    assert _json(response)["responses"]["rerank"]["status"] == 404
 
-    # Check each embedding
-    for i, embedding in enumerate(data["embeddings"]):
-        assert "vector" in embedding
-        assert "dimensions" in embedding
-        assert embedding["text"] == embed_request["text"][i]
-        assert embedding["model"] == embed_request["model"]
-        assert len(embedding["vector"]) == embedding["dimensions"]
 
+async def test_lifespan_manages_shared_clients():
+    """Test that startup creates the shared clients and shutdown closes them."""
+    app = create_app()
+    app.dependency_overrides[get_api_key] = lambda: "test-api-key"
 
-def test_vector_search():
-    """Test the vector search endpoint."""
-    search_request = {
-        "query": "Python programming",
-        "collection": "test_collection",
-        "num_results": 5,
-    }
+    async with app.router.lifespan_context(app):
+        http_client = app.state.search_client
+        service = app.state.search_service
+        assert isinstance(http_client, AsyncClient)
+        assert isinstance(service, SearchService)
+        assert service._http_client is http_client
+        has_redis = bool(settings.REDIS_URL) and HAS_REDIS
+        assert (app.state.redis_client is not None) == has_redis
 
-    response = client.post(
-        "/api/v1/vector/search",
-        json=search_request,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
+        # Requests use the service created at startup, not the lazy fallback
+        response = await _asgi_call(
+            app, "POST", "/api/v1/search/", SEARCH_BODY, BATCH_HEADERS
+        )
+        _check_search(response)
+        assert app.state.search_service is service
+        assert not http_client.is_closed
 
-    assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) <= search_request["num_results"]
-    assert "metadata" in data
-    assert data["metadata"]["collection"] == search_request["collection"]
+    assert http_client.is_closed
 
 
-def test_user_profile():
-    """Test user profile endpoints."""
-    user_id = "test_user"
+async def test_health_check(asgi_app):
+    """Test the health check endpoint."""
+    response = await _asgi_call(asgi_app, "GET", "/health", headers={})
+    _check_health(response)
 
-    # Get profile
-    response = client.get(
-        f"/api/v1/personalization/profile/{user_id}",
-        headers={settings.API_KEY_HEADER: "test-api-key"},
+
+async def test_validate_api_key(asgi_app):
+    """Test API key validation."""
+    # Valid API key
+    response = await _asgi_call(asgi_app, "GET", "/api/v1/validate")
+    _check_validate(response)
+
+    # Invalid API key
+    response = await _asgi_call(
+        asgi_app,
+        "GET",
+        "/api/v1/validate",
+        headers={settings.API_KEY_HEADER: "invalid-key"},
     )
+    assert response.status_code == 401
 
-    assert response.status_code == 200
-    profile = response.json()
-    assert profile["user_id"] == user_id
-    assert "preferences" in profile
-    assert "topics_of_interest" in profile
 
-    # Update profile
-    profile["topics_of_interest"].append("testing")
+async def test_analyze_query_twice(client):
+    """Test that repeating a query reuses its cached analysis."""
+    path = "/api/v1/search/analyze?query=python fastapi tutorial pagination"
 
-    response = client.put(
-        f"/api/v1/personalization/profile/{user_id}",
-        json=profile,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
+    first = await client.get(path)
+    second = await client.get(path)
 
-    assert response.status_code == 200
-    updated_profile = response.json()
-    assert "testing" in updated_profile["topics_of_interest"]
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
 
+    # Only the per-request fields differ
+    first_data, second_data = _json(first), _json(second)
+    assert first_data["query_id"] != second_data["query_id"]
+    for data in (first_data, second_data):
+        del data["query_id"], data["timestamp"]
+    assert first_data == second_data
 
-def test_personalization():
-    """Test personalization endpoint."""
-    personalization_request = {
-        "user_id": "test_user",
-        "content": [
-            {
-                "id": "result1",
-                "title": "Python Tutorial",
-                "url": "https://example.com/python",
-                "score": 0.95,
-            },
-            {
-                "id": "result2",
-                "title": "FastAPI Documentation",
-                "url": "https://example.com/fastapi",
-                "score": 0.90,
-            },
-        ],
-        "context": {"query": "python tutorial"},
-    }
 
-    response = client.post(
-        "/api/v1/personalization/rerank",
-        json=personalization_request,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
-    )
+async def test_embed_endpoint(client, primed_embeddings):
+    """Test the embedding endpoint."""
+    response = await _post(client, "/api/v1/vector/embed", EMBED_BODY)
+    _check_embed(response)
+
+    # Texts embedded before are served from the cache, unchanged
+    vectors = [embedding["vector"] for embedding in _json(response)["embeddings"]]
+    assert vectors == primed_embeddings
+
+
+async def test_embed_preserves_order(client):
+    """Test that embeddings come back in request order whatever the text lengths."""
+    response = await _post(client, "/api/v1/vector/embed", MIXED_EMBED_BODY)
 
     assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert "content" in data
-    assert len(data["results"]) == len(personalization_request["content"])
-    assert len(data["content"]) == len(personalization_request["content"])
-    assert "metadata" in data
-
-
-def test_user_feedback():
-    """Test user feedback endpoint."""
-    feedback_request = {
-        "user_id": "test_user",
-        "item_id": "result1",
-        "rating": 4.5,
-        "feedback_text": "Very helpful tutorial",
-        "source": "search",
-        "context": {"query": "python tutorial"},
-    }
+    embeddings = _json(response)["embeddings"]
+    texts = MIXED_EMBED_REQUEST["text"]
+    assert [embedding["text"] for embedding in embeddings] == texts
+    for embedding in embeddings:
+        assert len(embedding["vector"]) == embedding["dimensions"]
 
-    response = client.post(
-        "/api/v1/personalization/feedback",
-        json=feedback_request,
-        headers={settings.API_KEY_HEADER: "test-api-key"},
+    # A repeated text gets the same vector as its first occurrence
+    assert embeddings[-1]["vector"] == embeddings[0]["vector"]
+
+
+async def test_user_profile(client, warm_user):
+    """Test user profile endpoints."""
+    # Get profile
+    response = await client.get(f"/api/v1/personalization/profile/{warm_user}")
+    _check_profile(response)
+    profile = _json(response)
+
+    # Update profile
+    profile["topics_of_interest"].append("testing")
+
+    response = await client.put(
+        f"/api/v1/personalization/profile/{warm_user}",
+        content=orjson.dumps(profile),
+        headers=JSON_HEADERS,
     )
 
     assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "success"
-    assert "feedback_id" in data
-    assert "metadata" in data
+    updated_profile = _json(response)
+    assert "testing" in updated_profile["topics_of_interest"]
@@ -0,0 +1,94 @@
+"""
+Tests for top-k selection, scoring and shared profiles in the personalization
+service.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from llamasearchai.models.personalization import PersonalizationRequest
+from llamasearchai.services.personalization import PersonalizationService, _score_items
+from pydantic import ValidationError
+
+CONTENT = [
+    {"id": f"r{i}", "title": f"Result {i}", "score": score}
+    for i, score in enumerate([0.2, 0.9, 0.5, 0.7, 0.1, 0.8])
+]
+
+
+def _personalize(top_k=None):
+    """Personalize ``CONTENT`` for a fresh user."""
+    request = PersonalizationRequest(user_id="user-1", content=CONTENT, top_k=top_k)
+    return asyncio.run(PersonalizationService().personalize_content(request))
+
+
+@pytest.mark.parametrize("top_k", [1, 3, len(CONTENT), len(CONTENT) + 5])
+def test_top_k_keeps_the_highest_scoring_items(top_k):
+    full = _personalize()
+    response = _personalize(top_k)
+
+    assert response.content == full.content[:top_k]
+    assert [item["score"] for item in full.content] == sorted(
+        (item["score"] for item in full.content), reverse=True
+    )
+    # Per-item results still cover every input item
+    assert len(response.results) == len(CONTENT)
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_top_k_must_be_positive(top_k):
+    with pytest.raises(ValidationError):
+        PersonalizationRequest(user_id="user-1", content=CONTENT, top_k=top_k)
+
+
+def test_compiled_scoring_matches_python():
+    scoring = getattr(_score_items, "py_func", None)
+    if scoring is None:
+        pytest.skip("numba is not installed")
+    rng = np.random.default_rng(0)
+    original_scores = rng.uniform(0, 1, 200)
+    raw_scores = np.where(rng.uniform(size=200) < 0.1, 0.0, original_scores)
+    boosts = rng.uniform(-0.2, 0.6, 200)
+
+    compiled = _score_items(original_scores, raw_scores, boosts)
+    expected = scoring(original_scores, raw_scores, boosts)
+
+    np.testing.assert_array_equal(compiled[0], expected[0])
+    np.testing.assert_array_equal(compiled[1], expected[1])
+    assert compiled[0].min() >= 0.0 and compiled[0].max() <= 1.0
+
+
+class _FakeRedis:
+    """In-memory stand-in for the Redis commands the service uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+
+def test_profile_updates_are_shared_between_workers():
+    redis = _FakeRedis()
+    first, second = PersonalizationService(), PersonalizationService()
+    first.attach_redis(redis)
+    second.attach_redis(redis)
+
+    async def run():
+        profile = await first.get_user_profile("user-1")
+        loaded = await second.get_user_profile("user-1")
+        # An unchanged profile keeps the worker's instance and its cached terms
+        assert await second.get_user_profile("user-1") is loaded
+
+        updated = profile.copy(update={"topics_of_interest": ["gardening"]})
+        await first.update_user_profile("user-1", updated)
+        return loaded, await second.get_user_profile("user-1")
+
+    loaded, reloaded = asyncio.run(run())
+
+    assert loaded.topics_of_interest != ["gardening"]
+    assert reloaded.topics_of_interest == ["gardening"]
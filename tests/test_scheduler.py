@@ -0,0 +1,225 @@
+"""
+Tests for the scheduler's job index, due heap, cron schedules, job updates and
+job runs.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from llamasearchai.models.scheduler import (
+    Job,
+    JobCreate,
+    JobStatus,
+    JobUpdate,
+    Schedule,
+)
+from llamasearchai.services.scheduler import SchedulerService, _cron_iter, _JobIndex
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _job(
+    job_id: str,
+    status: JobStatus = JobStatus.PENDING,
+    age_minutes: int = 0,
+    next_run_time: datetime = None,
+) -> Job:
+    """Build a job with only the fields the scheduler indexes."""
+    return Job.construct(
+        id=job_id,
+        status=status,
+        created_at=NOW - timedelta(minutes=age_minutes),
+        next_run_time=next_run_time,
+    )
+
+
+@pytest.fixture
+def scheduler():
+    """A scheduler service whose loop is not running."""
+    scheduler = SchedulerService()
+    yield scheduler
+    scheduler._pool.shutdown(wait=False)
+
+
+def _queue(scheduler: SchedulerService, job: Job):
+    """Store a job on the scheduler and push it on the due heap."""
+    scheduler._jobs[job.id] = job
+    scheduler._push_due(job)
+
+
+@pytest.fixture
+def index():
+    """An index of five jobs, ``j0`` newest, with every third one completed."""
+    index = _JobIndex()
+    for i in range(5):
+        status = JobStatus.COMPLETED if i % 3 == 0 else JobStatus.PENDING
+        index.upsert(_job(f"j{i}", status, age_minutes=i))
+    return index
+
+
+def test_counts_jobs_by_status(index):
+    assert index.count(JobStatus.PENDING) == 3
+    assert index.count(JobStatus.COMPLETED) == 2
+    assert index.count(JobStatus.FAILED) == 0
+
+
+def test_pages_newest_first(index):
+    assert index.page(None, 0, 10) == ["j0", "j1", "j2", "j3", "j4"]
+    assert index.page(None, 1, 2) == ["j1", "j2"]
+    assert index.page(JobStatus.PENDING, 0, 10) == ["j1", "j2", "j4"]
+    assert index.page(JobStatus.COMPLETED, 1, 10) == ["j3"]
+    assert index.page(None, 5, 10) == []
+
+
+def test_upsert_refreshes_an_indexed_job(index):
+    index.upsert(_job("j1", JobStatus.FAILED, age_minutes=1))
+
+    assert index.count(JobStatus.PENDING) == 2
+    assert index.page(JobStatus.FAILED, 0, 10) == ["j1"]
+    assert index.page(None, 0, 10) == ["j0", "j1", "j2", "j3", "j4"]
+
+
+def test_remove_moves_the_last_row_into_the_gap(index):
+    index.remove("j1")
+    index.remove("missing")
+
+    assert index.page(None, 0, 10) == ["j0", "j2", "j3", "j4"]
+    assert index.count(JobStatus.PENDING) == 2
+
+    # The moved row is still addressable by its ID
+    index.remove("j4")
+    assert index.page(JobStatus.PENDING, 0, 10) == ["j2"]
+
+    index.upsert(_job("j5", age_minutes=-1))
+    assert index.page(None, 0, 10) == ["j5", "j0", "j2", "j3"]
+
+
+def test_grows_past_its_capacity(monkeypatch):
+    monkeypatch.setattr(_JobIndex, "_GROW_BY", 2)
+    index = _JobIndex()
+    for i in range(7):
+        index.upsert(_job(f"j{i}", age_minutes=i))
+
+    assert index.count(JobStatus.PENDING) == 7
+    assert index.page(None, 0, 10) == [f"j{i}" for i in range(7)]
+
+
+def test_pops_due_jobs_in_run_time_order(scheduler):
+    for i, minutes in enumerate([3, -1, 1, -5, -3]):
+        _queue(scheduler, _job(f"j{i}", next_run_time=NOW + timedelta(minutes=minutes)))
+
+    assert scheduler._pop_due_jobs(NOW) == ["j3", "j4", "j1"]
+    assert scheduler._pop_due_jobs(NOW) == []
+    assert scheduler._pop_due_jobs(NOW + timedelta(minutes=5)) == ["j2", "j0"]
+
+
+def test_skips_stale_due_entries(scheduler):
+    for i in range(4):
+        _queue(scheduler, _job(f"j{i}", next_run_time=NOW - timedelta(minutes=i)))
+
+    # Rescheduled, deleted and no longer pending jobs leave stale entries behind
+    _queue(scheduler, _job("j0", next_run_time=NOW + timedelta(minutes=1)))
+    del scheduler._jobs["j1"]
+    scheduler._jobs["j2"].status = JobStatus.RUNNING
+
+    assert scheduler._pop_due_jobs(NOW) == ["j3"]
+    assert scheduler._pop_due_jobs(NOW + timedelta(minutes=1)) == ["j0"]
+
+
+def test_compacts_stale_due_entries(scheduler, monkeypatch):
+    monkeypatch.setattr(SchedulerService, "_MIN_HEAP_COMPACT", 4)
+    for i in range(4):
+        _queue(scheduler, _job(f"j{i}", next_run_time=NOW))
+
+    for minutes in range(1, 100):
+        _queue(scheduler, _job("j0", next_run_time=NOW + timedelta(minutes=minutes)))
+        assert len(scheduler._due_heap) <= 2 * 4 + 1
+
+    assert scheduler._pop_due_jobs(NOW) == ["j1", "j2", "j3"]
+    assert scheduler._pop_due_jobs(NOW + timedelta(minutes=99)) == ["j0"]
+    assert scheduler._due_heap == []
+
+
+def test_cron_iterators_are_reused_per_expression():
+    pytest.importorskip("croniter")
+
+    assert _cron_iter("*/5 * * * *") is _cron_iter("*/5 * * * *")
+    assert _cron_iter("*/5 * * * *") is not _cron_iter("0 * * * *")
+
+
+def test_cron_next_run_ignores_earlier_use_of_the_iterator(scheduler):
+    pytest.importorskip("croniter")
+    schedule = Schedule(cron_expression="0 * * * *")
+
+    # Move the shared iterator far ahead of the current time
+    cron = _cron_iter(schedule.cron_expression)
+    for _ in range(48):
+        cron.get_next(datetime)
+
+    before = datetime.utcnow()
+    next_run = scheduler._calculate_next_run(schedule)
+
+    assert before < next_run <= datetime.utcnow() + timedelta(hours=1)
+    assert (next_run.minute, next_run.second) == (0, 0)
+
+
+def test_update_job_keeps_the_schedule_a_model(scheduler):
+    job = asyncio.run(
+        scheduler.schedule_job(
+            JobCreate(task_name="cleanup", schedule=Schedule(interval_seconds=60))
+        )
+    )
+
+    before = datetime.utcnow()
+    updated = asyncio.run(
+        scheduler.update_job(
+            job.id, JobUpdate(schedule=Schedule(interval_seconds=3600))
+        )
+    )
+
+    assert isinstance(updated.schedule, Schedule)
+    assert updated.schedule.interval_seconds == 3600
+    assert updated.next_run_time >= before + timedelta(seconds=3600)
+
+
+def test_due_jobs_run_concurrently(scheduler):
+    def slow(seconds):
+        time.sleep(seconds)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    scheduler.register_task("slow", slow)
+    scheduler.register_task("broken", broken)
+
+    async def run():
+        run_at = datetime.utcnow() + timedelta(milliseconds=50)
+        jobs = [
+            await scheduler.schedule_job(
+                JobCreate(
+                    task_name=task_name,
+                    args=args,
+                    schedule=Schedule(run_once_at=run_at),
+                )
+            )
+            for task_name, args in [("slow", [0.3])] * 3 + [("broken", [])]
+        ]
+        loop_task = asyncio.create_task(scheduler._run_scheduler())
+        start = time.perf_counter()
+        while any(job.status in (JobStatus.PENDING, JobStatus.RUNNING) for job in jobs):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        await scheduler.stop_scheduler()
+        loop_task.cancel()
+        return jobs, elapsed
+
+    jobs, elapsed = asyncio.run(run())
+
+    assert [job.status for job in jobs] == [JobStatus.COMPLETED] * 3 + [
+        JobStatus.FAILED
+    ]
+    assert all(job.next_run_time is None for job in jobs)
+    # Run one after another, the three slow jobs would take 0.9 seconds
+    assert elapsed < 0.7
@@ -0,0 +1,84 @@
+"""
+Tests for near-duplicate detection in the search service.
+"""
+
+import asyncio
+
+import pytest
+from llamasearchai.config.settings import settings
+from llamasearchai.models.search import SearchResult
+from llamasearchai.services.search import SearchService, _DuplicateFilter
+
+SNIPPET = (
+    "Boil a large pot of salted water, add the pasta and stir so it does not "
+    "stick. Cook until al dente, then drain and toss with the sauce."
+)
+
+
+def _result(title: str, url: str, snippet: str = SNIPPET) -> SearchResult:
+    """Build a search result with only the fields deduplication reads."""
+    return SearchResult.construct(title=title, url=url, snippet=snippet)
+
+
+@pytest.fixture
+def duplicates():
+    """A SimHash duplicate filter holding one kept result."""
+    duplicates = _DuplicateFilter(use_minhash=False)
+    assert not duplicates.is_duplicate(
+        _result("How to cook pasta at home quickly", "https://a.example/pasta")
+    )
+    return duplicates
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        _result("How to cook pasta at home quickly", "https://a.example/pasta"),
+        _result("How To Cook Pasta At Home, Quickly!", "https://b.example/p?ref=1"),
+        _result(
+            "How to cook pasta at home quickly",
+            "https://c.example/pasta",
+            SNIPPET[: SNIPPET.rindex(" ")] + " ...",
+        ),
+    ],
+    ids=["same-url", "reformatted-title", "truncated-snippet"],
+)
+def test_near_duplicates_are_dropped(duplicates, result):
+    assert duplicates.is_duplicate(result)
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        _result("How to cook pasta at home slowly", "https://a.example/slow"),
+        _result(
+            "How to cook pasta at home quickly",
+            "https://a.example/sauce",
+            "Simmer crushed tomatoes with garlic and olive oil for twenty minutes.",
+        ),
+    ],
+    ids=["other-title", "other-snippet"],
+)
+def test_distinct_results_are_kept(duplicates, result):
+    assert not duplicates.is_duplicate(result)
+
+
+def test_combined_provider_results_keep_distinct_urls(monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GOOGLE_CX", "test-cx")
+    monkeypatch.setattr(settings, "BING_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "SEARCH_DEDUP_METHOD", "simhash")
+    query = "how to cook pasta at home quickly"
+
+    async def combine():
+        async with SearchService() as service:
+            provider_results = {
+                "google": await service._search_google(query, 10),
+                "bing": await service._search_bing(query, 10),
+            }
+            return service._combine_results(provider_results, 20)
+
+    results, duplicates_found = asyncio.run(combine())
+
+    assert duplicates_found == 0
+    assert len({str(result.url) for result in results}) == 20
@@ -0,0 +1,193 @@
+"""
+Tests for the in-memory vector store and the vector service.
+"""
+
+import asyncio
+import base64
+
+import numpy as np
+import pytest
+from llamasearchai.models.vector import (
+    UpsertVectorsRequest,
+    VectorPrecision,
+    VectorRecord,
+    VectorSearchRequest,
+)
+from llamasearchai.services.vector import (
+    VectorService,
+    _encode_vectors,
+    _VectorMatrix,
+)
+
+DIMENSION = 8
+
+
+def _records(vectors, **metadata):
+    """Build vector records with IDs ``v0``, ``v1``, ... and shared metadata."""
+    return [
+        VectorRecord(id=f"v{i}", vector=list(vector), metadata=dict(metadata))
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def vectors():
+    """Random float32 vectors, one per row."""
+    return np.random.default_rng(0).standard_normal((50, DIMENSION)).astype(np.float32)
+
+
+def test_fp16_encoding_round_trips(vectors):
+    encoded, scales = _encode_vectors(vectors, VectorPrecision.FP16)
+
+    assert scales == [None] * len(vectors)
+    decoded = np.stack([np.frombuffer(base64.b64decode(row), "<f2") for row in encoded])
+    np.testing.assert_allclose(decoded, vectors, rtol=1e-3, atol=1e-3)
+
+
+def test_int8_encoding_round_trips(vectors):
+    vectors[0] = 0.0
+    encoded, scales = _encode_vectors(vectors, VectorPrecision.INT8)
+
+    decoded = np.stack(
+        [
+            np.frombuffer(base64.b64decode(row), np.int8) * scale
+            for row, scale in zip(encoded, scales)
+        ]
+    )
+    # Each value is within half a quantization step of the original
+    steps = np.array(scales)[:, None]
+    assert np.all(np.abs(decoded - vectors) <= steps / 2 + 1e-6)
+    assert np.all(decoded[0] == 0.0)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_upsert_counts_inserts_and_updates(vectors, quantize):
+    store = _VectorMatrix(DIMENSION, quantize)
+
+    assert store.upsert(_records(vectors[:30])) == (30, 0)
+    assert store.upsert(_records(vectors[:40])) == (10, 30)
+    assert len(store) == 40
+
+    # The last record of a repeated ID wins
+    repeated = _records(vectors[:2])
+    repeated[1].id = "v0"
+    assert store.upsert(repeated) == (0, 1)
+    stored = store.record(store._rows["v0"], 1.0, include_vector=True).vector
+    np.testing.assert_allclose(stored, vectors[1], atol=0.05)
+
+
+def test_upsert_rejects_wrong_dimension(vectors):
+    store = _VectorMatrix(DIMENSION)
+    with pytest.raises(ValueError):
+        store.upsert([VectorRecord(id="v0", vector=[1.0, 2.0])])
+    store.upsert(_records(vectors))
+    with pytest.raises(ValueError):
+        store.search([1.0, 2.0], 5)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_search_ranks_by_cosine_similarity(vectors, quantize):
+    store = _VectorMatrix(DIMENSION, quantize)
+    store.upsert(_records(vectors))
+    query = vectors[7] * 3
+
+    rows, scores, filtered = store.search(query, 5)
+
+    assert filtered == 0
+    assert len(rows) == 5
+    assert store.record(int(rows[0]), float(scores[0])).id == "v7"
+    assert scores[0] == pytest.approx(1.0, abs=0.01)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_search_applies_metadata_filter(vectors):
+    store = _VectorMatrix(DIMENSION)
+    store.upsert(_records(vectors[:20], category="a"))
+    store.upsert(
+        [
+            VectorRecord(id=f"b{i}", vector=list(vector), metadata={"category": "b"})
+            for i, vector in enumerate(vectors[20:25])
+        ]
+    )
+
+    rows, scores, filtered = store.search(vectors[0], 10, {"category": "b"})
+
+    assert filtered == 20
+    assert len(rows) == 5
+    assert {store.record(int(row), 0.0).id for row in rows} == {
+        f"b{i}" for i in range(5)
+    }
+    assert np.all(np.isfinite(scores))
+
+
+def test_int8_store_scores_across_blocks(vectors, monkeypatch):
+    monkeypatch.setattr(_VectorMatrix, "_SCORE_BLOCK", 16)
+    exact = _VectorMatrix(DIMENSION)
+    quantized = _VectorMatrix(DIMENSION, quantize=True)
+    exact.upsert(_records(vectors))
+    quantized.upsert(_records(vectors))
+
+    for query in vectors[::5]:
+        _, exact_scores, _ = exact.search(query, len(vectors))
+        _, quantized_scores, _ = quantized.search(query, len(vectors))
+        np.testing.assert_allclose(quantized_scores, exact_scores, atol=0.02)
+
+    # Stored vectors come back dequantized, within half a step of their scale
+    row = quantized._rows["v3"]
+    restored = np.array(quantized.record(row, 1.0, include_vector=True).vector)
+    assert np.abs(restored - vectors[3]).max() <= quantized._scales[row] / 2 + 1e-6
+
+
+def test_int8_store_ranks_like_fp32():
+    vectors = np.random.default_rng(1).standard_normal((2000, 64)).astype(np.float32)
+    exact = _VectorMatrix(64)
+    quantized = _VectorMatrix(64, quantize=True)
+    exact.upsert(_records(vectors))
+    quantized.upsert(_records(vectors))
+
+    recalls = []
+    for query in vectors[:50] + 0.5:
+        exact_rows, _, _ = exact.search(query, 10)
+        quantized_rows, _, _ = quantized.search(query, 10)
+        assert quantized_rows[0] == exact_rows[0]
+        recalls.append(len(set(exact_rows) & set(quantized_rows)) / 10)
+
+    assert np.mean(recalls) >= 0.95
+
+
+def test_text_query_uses_model_of_collection_dimension(vectors):
+    service = VectorService()
+    asyncio.run(
+        service.upsert_vectors(
+            UpsertVectorsRequest(
+                collection="small",
+                vectors=_records(np.resize(vectors, (10, 384))),
+                create_collection=True,
+            )
+        )
+    )
+
+    response = asyncio.run(
+        service.vector_search(VectorSearchRequest(query="hello", collection="small"))
+    )
+
+    assert response.metadata.vector_dimensions == 384
+    assert len(response.results) == 10
+
+
+def test_vector_query_of_wrong_dimension_is_rejected(vectors):
+    service = VectorService()
+    asyncio.run(
+        service.upsert_vectors(
+            UpsertVectorsRequest(
+                collection="small", vectors=_records(vectors), create_collection=True
+            )
+        )
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            service.vector_search(
+                VectorSearchRequest(query=[1.0, 2.0], collection="small")
+            )
+        )